@@ -0,0 +1,400 @@
+"""
+Long-running local pricing service for the Bond Valuation Tool.
+
+Concurrent requests are collected into small batches and valued together with BondBatch, so callers
+get single-bond prices without importing the tool or paying its start-up in their own process.
+
+Usage:
+    python Bond_Pricing_Service.py serve --port 8787
+    python Bond_Pricing_Service.py serve --unix /tmp/bond_pricing.sock
+    python Bond_Pricing_Service.py loadtest --requests 20000 --concurrency 64
+
+Requests (HTTP/1.1, keep-alive):
+    POST /price   one position as a JSON object (the columns of the value command), or a JSON list of them
+    GET  /health  service statistics
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import signal
+import sys
+import time
+import traceback
+
+import numpy as np
+
+from Bond_Valuation_Tool import parse_positions, value_inputs
+
+
+class MicroBatcher:
+    """
+    Collects concurrent pricing requests into batches valued in one BondBatch pass.
+
+    A batch is priced as soon as max_batch positions are waiting, or max_delay seconds after the first
+    position of the batch arrived, whichever comes first. If pricing a batch fails unexpectedly, its
+    requests fail with the error and the task carries on; if the task itself ever exits, it is restarted.
+    """
+
+    def __init__(self, max_batch=256, max_delay=0.002):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.positions = 0
+        self.restarts = 0
+        self.__queue = asyncio.Queue()
+        self.__task = None
+
+    def start(self):
+        """Starts the batching task on the running event loop."""
+        self.__task = asyncio.get_running_loop().create_task(self.__run())
+        self.__task.add_done_callback(self.__restart)
+
+    @property
+    def running(self):
+        """Whether the batching task is running."""
+        return self.__task is not None and not self.__task.done()
+
+    def __restart(self, task):
+        """Restarts the batching task when it exits for any reason other than stop()."""
+        if task.cancelled():
+            return
+        print(f"Batching task exited ({task.exception()!r}), restarting", file=sys.stderr)
+        self.restarts += 1
+        self.start()
+
+    async def stop(self):
+        """Stops the batching task."""
+        self.__task.cancel()
+        try:
+            await self.__task
+        except asyncio.CancelledError:
+            pass
+
+    async def price(self, row):
+        """
+        Values one position.
+
+        Args:
+            row (dict): The position fields (face_value, coupon_rate, yield_rate, coupon_frequency,
+                maturity_date, settlement_date and optionally day_count).
+
+        Returns:
+            dict: The valuation fields.
+
+        Raises:
+            ValueError: When the position is invalid or cannot be valued.
+        """
+        if not isinstance(row, dict):
+            raise ValueError("expected a JSON object")
+        _, _, inputs, error = next(parse_positions([(0, row)]))
+        if error is not None:
+            raise ValueError(error)
+        future = asyncio.get_running_loop().create_future()
+        await self.__queue.put((inputs, future))
+        return await future
+
+    async def __run(self):
+        """Takes batches off the queue and values them, for as long as the service runs."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.__queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self.__queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.__queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            try:
+                self.__price_batch(batch)
+            except Exception as error:
+                # Fail this batch's requests rather than the task, so later requests are still served
+                traceback.print_exc()
+                self.__fail(batch, error)
+            except BaseException as error:
+                self.__fail(batch, error)
+                raise
+
+    @staticmethod
+    def __fail(batch, error):
+        """Fails the requests of a batch that are still waiting."""
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(RuntimeError(f"pricing failed: {error!r}"))
+
+    def __price_batch(self, batch):
+        """
+        Values a batch and resolves the futures of its requests.
+
+        Args:
+            batch (list): (Bond inputs, future) pairs.
+        """
+        self.batches += 1
+        self.positions += len(batch)
+        valuations = value_inputs([inputs for inputs, _ in batch])
+        for (valuation, error), (_, future) in zip(valuations, batch):
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(valuation)
+            else:
+                future.set_exception(ValueError(error))
+
+
+class PricingService:
+    """
+    Minimal HTTP/1.1 front end (TCP or Unix socket) for a MicroBatcher.
+    """
+
+    def __init__(self, max_batch=256, max_delay=0.002):
+        self.batcher = MicroBatcher(max_batch, max_delay)
+        self.requests = 0
+        self.started = None
+        self.__server = None
+        self.__connections = set()
+
+    async def start(self, host="127.0.0.1", port=8787, unix_path=None):
+        """
+        Starts listening.
+
+        Args:
+            host (str, optional): The TCP host. Defaults to 127.0.0.1.
+            port (int, optional): The TCP port (0 for any free port). Defaults to 8787.
+            unix_path (str, optional): Listen on this Unix socket instead of TCP.
+
+        Returns:
+            asyncio.Server: The server.
+        """
+        self.batcher.start()
+        self.started = time.time()
+        if unix_path:
+            self.__server = await asyncio.start_unix_server(self.__handle, unix_path)
+        else:
+            self.__server = await asyncio.start_server(self.__handle, host, port)
+        return self.__server
+
+    async def stop(self):
+        """Stops listening, closes the open connections and stops the batcher."""
+        self.__server.close()
+        for writer in list(self.__connections):
+            writer.close()
+        await self.__server.wait_closed()
+        await self.batcher.stop()
+
+    def health(self):
+        """
+        Returns the service statistics.
+
+        Returns:
+            dict: Status, uptime, requests, batches, mean batch size and batching task restarts.
+        """
+        return {
+            'status': 'ok' if self.batcher.running else 'unhealthy',
+            'uptime': time.time() - self.started,
+            'requests': self.requests,
+            'batches': self.batcher.batches,
+            'mean_batch_size': self.batcher.positions / self.batcher.batches if self.batcher.batches else 0.0,
+            'batcher_restarts': self.batcher.restarts,
+        }
+
+    async def __handle(self, reader, writer):
+        """Serves the requests of one connection until the client closes it."""
+        self.__connections.add(writer)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+                status, payload = await self.__respond(request_line, body)
+                data = json.dumps(payload, default=str).encode()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.__connections.discard(writer)
+            writer.close()
+
+    async def __respond(self, request_line, body):
+        """
+        Routes one request.
+
+        Args:
+            request_line (str): The HTTP request line.
+            body (bytes): The request body.
+
+        Returns:
+            tuple: The HTTP status line text and the JSON payload.
+        """
+        method, path = (request_line.split(" ") + ["", ""])[:2]
+        if method == "GET" and path == "/health":
+            return "200 OK", self.health()
+        if method != "POST" or path != "/price":
+            return "404 Not Found", {'error': f"unknown request {method} {path}"}
+        self.requests += 1
+        try:
+            positions = json.loads(body)
+        except ValueError as error:
+            return "400 Bad Request", {'error': f"invalid JSON: {error}"}
+        if isinstance(positions, list):
+            results = await asyncio.gather(*(self.batcher.price(position) for position in positions), return_exceptions=True)
+            return "200 OK", [{'error': str(result)} if isinstance(result, Exception) else result for result in results]
+        if not isinstance(positions, dict):
+            return "400 Bad Request", {'error': "expected a JSON object or list of objects"}
+        try:
+            return "200 OK", await self.batcher.price(positions)
+        except ValueError as error:
+            return "400 Bad Request", {'error': str(error)}
+        except RuntimeError as error:
+            return "500 Internal Server Error", {'error': str(error)}
+
+
+async def _client(host, port, bodies, latencies):
+    """
+    Load test client: sends its requests one after another on one keep-alive connection.
+
+    Args:
+        host (str): The service host.
+        port (int): The service port.
+        bodies (list): The encoded JSON request bodies.
+        latencies (list): Request latencies (seconds) are appended here.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    for body in bodies:
+        start = time.perf_counter()
+        writer.write(f"POST /price HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await writer.drain()
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = int(head.split(b"Content-Length:")[1].split(b"\r\n")[0])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def load_test(requests=10000, concurrency=64, max_batch=256, max_delay=0.002, seed=0):
+    """
+    Runs the service on a free local port and drives it with concurrent clients, fully offline.
+
+    Args:
+        requests (int, optional): The total number of requests. Defaults to 10000.
+        concurrency (int, optional): The number of concurrent clients. Defaults to 64.
+        max_batch (int, optional): The batcher's maximum batch size. Defaults to 256.
+        max_delay (float, optional): The batcher's maximum wait in seconds. Defaults to 0.002.
+        seed (int, optional): The random seed of the synthetic positions. Defaults to 0.
+
+    Returns:
+        dict: Requests, seconds, requests per second, p50/p99/max latency (ms), batches and mean batch size.
+    """
+    rng = random.Random(seed)
+    settlement = datetime.date(2024, 12, 31)
+    bodies = [json.dumps({
+        'face_value': rng.choice([1000, 10000, 1000000]),
+        'coupon_rate': round(rng.uniform(0.0, 0.1), 4),
+        'yield_rate': round(rng.uniform(0.001, 0.1), 4),
+        'coupon_frequency': rng.choice([1, 2, 4, 12]),
+        'maturity_date': (settlement + datetime.timedelta(days=rng.randint(365, 365 * 30))).isoformat(),
+        'settlement_date': settlement.isoformat(),
+    }).encode() for _ in range(requests)]
+
+    service = PricingService(max_batch, max_delay)
+    server = await service.start(port=0)
+    port = server.sockets[0].getsockname()[1]
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client("127.0.0.1", port, bodies[client::concurrency], latencies) for client in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    health = service.health()
+    await service.stop()
+
+    p50, p99 = np.percentile(np.array(latencies) * 1000, [50, 99])
+    return {
+        'requests': len(latencies),
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed,
+        'p50_ms': float(p50),
+        'p99_ms': float(p99),
+        'max_ms': max(latencies) * 1000,
+        'batches': health['batches'],
+        'mean_batch_size': health['mean_batch_size'],
+    }
+
+
+async def _serve(args):
+    """Runs the service until interrupted."""
+    service = PricingService(args.max_batch, args.max_delay_ms / 1000)
+    await service.start(args.host, args.port, args.unix)
+    print(f"Pricing service listening on {args.unix or f'http://{args.host}:{args.port}'}", file=sys.stderr)
+    stopped = asyncio.Event()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        asyncio.get_running_loop().add_signal_handler(signal_number, stopped.set)
+    try:
+        await stopped.wait()
+    finally:
+        await service.stop()
+        if args.unix and os.path.exists(args.unix):
+            os.remove(args.unix)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list, optional): The command line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: The process exit status.
+    """
+    parser = argparse.ArgumentParser(prog="Bond_Pricing_Service.py", description="Bond Valuation Tool pricing service")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("serve", "run the pricing service"), ("loadtest", "load test the service on a local port")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--max-batch", type=int, default=256, help="largest batch priced at once (default 256)")
+        command.add_argument("--max-delay-ms", type=float, default=2.0, help="longest wait for a batch to fill (default 2 ms)")
+    serve_parser = commands.choices["serve"]
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8787)
+    serve_parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    load_parser = commands.choices["loadtest"]
+    load_parser.add_argument("--requests", type=int, default=10000)
+    load_parser.add_argument("--concurrency", type=int, default=64)
+    load_parser.add_argument("--output", help="also write the results to this JSON file")
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        asyncio.run(_serve(args))
+        return 0
+
+    result = asyncio.run(load_test(args.requests, args.concurrency, args.max_batch, args.max_delay_ms / 1000))
+    print(f"{result['requests']:,} requests in {result['seconds']:.2f} s: {result['requests_per_second']:,.0f} requests/s, "
+          f"p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms, max {result['max_ms']:.2f} ms, "
+          f"{result['batches']:,} batches of {result['mean_batch_size']:.1f} on average")
+    if args.output:
+        with open(args.output, "w") as stream:
+            json.dump(result, stream, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
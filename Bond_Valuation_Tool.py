@@ -1,288 +1,2288 @@
 import datetime
 import calendar
 import math
-import xlsxwriter
+import argparse
+import array
+import bisect
+import collections
+import concurrent.futures
+import contextlib
+import cProfile
+import csv
+import decimal
+import functools
+import hashlib
+import json
+import os
 import random
+import sys
+import time
+import tracemalloc
+import numpy as np
 
 
-def round_number(number, decimal_places):
+class _Stage:
+    """Timer, call counter and (while tracemalloc is tracing) net memory of one pipeline stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.memory = 0
+        self.__starts = []
+
+    def __enter__(self):
+        self.__starts.append((time.perf_counter(), tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None))
+        return self
+
+    def __exit__(self, *exc_info):
+        start, memory = self.__starts.pop()
+        self.seconds += time.perf_counter() - start
+        self.calls += 1
+        if memory is not None and tracemalloc.is_tracing():
+            self.memory += tracemalloc.get_traced_memory()[0] - memory
+        return False
+
+
+_NULL_STAGE = contextlib.nullcontext()  # Shared by every stage while instrumentation is off
+
+
+class Instrumentation:
+    """
+    Optional per-stage timers and call counters for the valuation pipeline
+    (schedule, day_count, pricing, rounding, amortization, excel_report, excel_save, and parse and write in the value command).
+
+    Off by default: stage() then returns one shared null context, so an instrumented block costs a
+    single method call. Stages can nest (e.g. pricing inside amortization), so their shares of the
+    total can add up to more than 100%.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def enable(self):
+        """Starts recording stages."""
+        self.enabled = True
+
+    def disable(self):
+        """Stops recording stages, keeping what was recorded."""
+        self.enabled = False
+
+    def reset(self):
+        """Clears the recorded stages and the last profile."""
+        self.__stages = {}
+        self.__snapshot = None
+        self.elapsed = None       # Wall time of the last profile (seconds)
+        self.peak_memory = None   # Peak traced memory of the last profile (bytes)
+
+    def stage(self, name):
+        """
+        Returns the context manager that times one run of a stage.
+
+        Args:
+            name (str): The stage name.
+
+        Returns:
+            A context manager.
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        stage = self.__stages.get(name)
+        if stage is None:
+            stage = self.__stages[name] = _Stage(name)
+        return stage
+
+    def summary(self):
+        """
+        Returns the recorded stages.
+
+        Returns:
+            dict: The calls, seconds and net traced memory (bytes, 0 when not tracing) of each stage.
+        """
+        return {name: {'calls': stage.calls, 'seconds': stage.seconds, 'memory': stage.memory} for name, stage in self.__stages.items()}
+
+    @contextlib.contextmanager
+    def profile(self, directory=None, name="valuation"):
+        """
+        Records stages, a cProfile profile and a tracemalloc snapshot for the enclosed block.
+
+        Args:
+            directory (str, optional): Where to dump name.prof (for pstats / snakeviz) and name.tracemalloc
+                (for tracemalloc.Snapshot.load). Nothing is written when not given.
+            name (str, optional): The dump file name stem. Defaults to "valuation".
+
+        Yields:
+            Instrumentation: This instrumentation, for report() after the block.
+        """
+        self.reset()
+        self.enable()
+        profiler = cProfile.Profile()
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            yield self
+        finally:
+            profiler.disable()
+            self.elapsed = time.perf_counter() - start
+            self.__snapshot = tracemalloc.take_snapshot()
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            if not tracing:
+                tracemalloc.stop()
+            self.disable()
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+                profiler.dump_stats(os.path.join(directory, f"{name}.prof"))
+                self.__snapshot.dump(os.path.join(directory, f"{name}.tracemalloc"))
+
+    def report(self, top=10):
+        """
+        Formats the recorded stages, slowest first, and the largest allocation sites of the last profile.
+        Shares are of the profile's wall time, or of the summed stage times outside a profile.
+
+        Args:
+            top (int, optional): The number of allocation sites listed. Defaults to 10.
+
+        Returns:
+            str: The summary report.
+        """
+        stages = sorted(self.__stages.values(), key=lambda stage: stage.seconds, reverse=True)
+        total = self.elapsed or sum(stage.seconds for stage in stages) or 1.0
+        lines = [f"{'stage':<14} {'calls':>10} {'seconds':>10} {'us/call':>10} {'share':>7} {'net MB':>8}"]
+        for stage in stages:
+            lines.append(f"{stage.name:<14} {stage.calls:>10,} {stage.seconds:>10.4f} {stage.seconds / max(stage.calls, 1) * 1e6:>10.2f} "
+                         f"{stage.seconds / total:>7.1%} {stage.memory / 2 ** 20:>8.2f}")
+        if self.__snapshot is not None:
+            lines.append(f"\nPeak traced memory {self.peak_memory / 2 ** 20:.2f} MB; largest allocation sites:")
+            for statistic in self.__snapshot.statistics('lineno')[:top]:
+                lines.append(f"  {statistic.size / 2 ** 20:8.2f} MB {statistic.count:>9,} blocks  {statistic.traceback[0]}")
+        return "\n".join(lines)
+
+
+INSTRUMENTATION = Instrumentation()  # Shared instrumentation of the valuation pipeline, off by default
+
+
+def _instrumented(stage):
+    """
+    Decorator that records every call of a function as one run of a stage.
+
+    Args:
+        stage (str): The stage name.
+
+    Returns:
+        function: The decorator.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with INSTRUMENTATION.stage(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ========================================================================================================================================================================================================================================================================
+_EXACT_INTEGER_LIMIT = 2.0 ** 52    # Scaled values at or above this have no fractional part left to round
+_TIE_TOLERANCE = 1e-9               # Distance from .5 treated as a possible tie ...
+_TIE_RELATIVE_TOLERANCE = 1e-15     # ... plus the relative error of scaling by a power of ten
+
+
+def round_number(number, decimal_places, mode=decimal.ROUND_HALF_UP):
+    """
+    Rounds a floating-point number to a given number of decimal places.
+
+    The number is scaled and rounded numerically. Only when the scaled value sits within floating-point
+    error of a tie (e.g. 2.675, stored as 2.67499999...) is the decimal the float prints as rounded
+    with the decimal module, so ties are decided on the printed digits, not on binary noise.
+
+    Parameters:
+    number (float): The input number to be rounded.
+    decimal_places (int): The number of decimal places to round to.
+    mode (str): decimal.ROUND_HALF_UP (ties away from zero, the default) or decimal.ROUND_HALF_EVEN (banker's rounding).
+
+    Returns:
+    float: The rounded number.
+    """
+    scale = 10.0 ** decimal_places
+    scaled = abs(number) * scale
+
+    # Infinities, NaN and numbers too large to have any decimals left are returned unchanged
+    if not scaled < _EXACT_INTEGER_LIMIT:
+        return float(number)
+
+    whole = math.floor(scaled)
+    remainder = scaled - whole
+    if abs(remainder - 0.5) <= _TIE_TOLERANCE + scaled * _TIE_RELATIVE_TOLERANCE:
+        return float(decimal.Decimal(repr(float(number))).quantize(decimal.Decimal(1).scaleb(-decimal_places), rounding=mode))
+    return math.copysign((whole + (remainder > 0.5)) / scale, number)
+
+
+@_instrumented('rounding')
+def round_array(values, decimal_places, mode=decimal.ROUND_HALF_UP):
+    """
+    Vectorized round_number for batch results.
+
+    Parameters:
+    values (array-like): The input numbers to be rounded.
+    decimal_places (int): The number of decimal places to round to.
+    mode (str): decimal.ROUND_HALF_UP (the default) or decimal.ROUND_HALF_EVEN.
+
+    Returns:
+    numpy.ndarray: The rounded numbers.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scale = 10.0 ** decimal_places
+    scaled = np.abs(values) * scale
+    with np.errstate(invalid='ignore'):
+        whole = np.floor(scaled)
+        remainder = scaled - whole
+        rounded = np.copysign((whole + (remainder > 0.5)) / scale, values)
+
+    exact = ~(scaled < _EXACT_INTEGER_LIMIT)
+    rounded[exact] = values[exact]
+
+    # The few values within floating-point error of a tie are settled on their printed digits
+    with np.errstate(invalid='ignore'):
+        ties = np.flatnonzero(np.abs(remainder - 0.5) <= _TIE_TOLERANCE + scaled * _TIE_RELATIVE_TOLERANCE)
+    for index in ties:
+        rounded.flat[index] = round_number(values.flat[index], decimal_places, mode)
+    return rounded
+
+
+def _add_months(sourcedate, months):
+    """
+    Adds (or subtracts) months to a given date.
+    Args:
+        sourcedate (datetime.date): The source date.
+        months (int): The number of months to add or subtract.
+
+    Returns:
+        datetime.date: The resulting date after adding or subtracting months.
+    """
+    month = sourcedate.month - 1 + months
+    year = sourcedate.year + month // 12
+    month = month % 12 + 1
+    day = min(sourcedate.day, calendar.monthrange(year, month)[1])
+    return datetime.date(year, month, day)
+
+
+class ScheduleCache:
+    """
+    Bounded LRU cache of coupon schedules shared by every Bond.
+
+    Each (maturity date, coupon frequency) schedule is generated once, walking back from maturity one
+    coupon period at a time, and stored as an ascending array of date ordinals. A bond finds the coupon
+    period of its settlement date with a binary search. When a settlement date falls before the cached
+    schedule, the schedule is extended further back in place of the old entry.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__schedules = collections.OrderedDict()
+
+    def window(self, maturity_date, coupon_frequency, settlement_date):
+        """
+        Returns the coupon schedule of a bond and the position of its settlement date in it.
+
+        Args:
+            maturity_date (datetime.date): The maturity date of the bond.
+            coupon_frequency (int): The number of coupon payments per year.
+            settlement_date (datetime.date): The settlement date of the bond.
+
+        Returns:
+            tuple: The ascending array of coupon date ordinals (ending at maturity) and the index of the
+            coupon date on or before the settlement date (always before maturity).
+        """
+        key = (maturity_date, coupon_frequency)
+        settlement = settlement_date.toordinal()
+        ordinals = self.__schedules.get(key)
+        if ordinals is not None and len(ordinals) > 1 and ordinals[0] <= settlement:
+            self.hits += 1
+            self.__schedules.move_to_end(key)
+        else:
+            self.misses += 1
+            ordinals = self.__extend(ordinals, maturity_date, coupon_frequency, settlement)
+            self.__schedules[key] = ordinals
+            self.__schedules.move_to_end(key)
+            if len(self.__schedules) > self.maxsize:
+                self.__schedules.popitem(last=False)
+        index = min(bisect.bisect_right(ordinals, settlement) - 1, len(ordinals) - 2)
+        return ordinals, index
+
+    def __extend(self, ordinals, maturity_date, coupon_frequency, settlement):
+        """
+        Generates coupon dates backwards from the earliest cached date until one falls on or before settlement.
+
+        Args:
+            ordinals (array.array): The cached schedule, or None.
+            maturity_date (datetime.date): The maturity date of the bond.
+            coupon_frequency (int): The number of coupon payments per year.
+            settlement (int): The settlement date ordinal.
+
+        Returns:
+            array.array: The extended ascending schedule of date ordinals.
+        """
+        if ordinals is None:
+            ordinals = array.array('i', [maturity_date.toordinal()])
+        months_interval = 12 // coupon_frequency
+        current_date = datetime.date.fromordinal(ordinals[0])
+        earlier_dates = []
+        while True:
+            current_date = _add_months(current_date, -months_interval)
+            earlier_dates.append(current_date.toordinal())
+            if earlier_dates[-1] <= settlement:
+                break
+        earlier_dates.reverse()
+        return array.array('i', earlier_dates) + ordinals
+
+    def clear(self):
+        """Empties the cache and resets the hit and miss counters."""
+        self.__schedules.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """
+        Returns the cache statistics.
+
+        Returns:
+            dict: A dictionary containing the hits, misses, current size and maximum size.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.__schedules), 'maxsize': self.maxsize}
+
+
+SCHEDULE_CACHE = ScheduleCache() # Coupon schedules shared by every Bond
+
+# ========================================================================================================================================================================================================================================================================
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()  # Date ordinal of the datetime64 epoch
+
+
+def _ordinal_ymd(ordinals):
+    """
+    Splits date ordinals (as returned by datetime.date.toordinal) into year, month and day.
+
+    Args:
+        ordinals (int or numpy.ndarray): The date ordinals.
+
+    Returns:
+        tuple: (year, month, day), as ints or integer arrays.
+    """
+    if not isinstance(ordinals, np.ndarray):
+        date = datetime.date.fromordinal(ordinals)
+        return date.year, date.month, date.day
+    dates = (ordinals - _EPOCH_ORDINAL).astype('datetime64[D]')
+    months = dates.astype('datetime64[M]')
+    years = dates.astype('datetime64[Y]')
+    return (years.astype(np.int64) + 1970, (months - years).astype(np.int64) + 1, (dates - months).astype(np.int64) + 1)
+
+
+def _days_360(start, end):
+    """
+    Counts the days between two dates on the US (NASD) 30/360 basis, as Excel's basis 0:
+    - When both dates are the last day of February, the end day counts as the 30th.
+    - When the start date is the last day of February, its day counts as the 30th.
+    - A 31st end day counts as the 30th when the start day is the 30th or 31st.
+    - A 31st start day counts as the 30th.
+
+    Args:
+        start (int or numpy.ndarray): The start date ordinals.
+        end (int or numpy.ndarray): The end date ordinals.
+
+    Returns:
+        int or numpy.ndarray: The number of 30/360 days.
+    """
+    start_year, start_month, start_day = _ordinal_ymd(start)
+    end_year, end_month, end_day = _ordinal_ymd(end)
+    start_last_february = (start_month == 2) & (_ordinal_ymd(start + 1)[2] == 1)
+    end_last_february = (end_month == 2) & (_ordinal_ymd(end + 1)[2] == 1)
+    end_day = np.where(start_last_february & end_last_february, 30, end_day)
+    start_day = np.where(start_last_february, 30, start_day)
+    end_day = np.where((end_day == 31) & (start_day >= 30), 30, end_day)
+    start_day = np.where(start_day == 31, 30, start_day)
+    days = 360 * (end_year - start_year) + 30 * (end_month - start_month) + (end_day - start_day)
+    return days if isinstance(start, np.ndarray) else int(days)
+
+
+def _actual_actual(previous_coupon_date, settlement_date, next_coupon_date, coupon_frequency):
+    """ACT/ACT (ICMA): actual days, over the actual number of days in the coupon period."""
+    return abs(settlement_date - previous_coupon_date), abs(next_coupon_date - settlement_date), abs(next_coupon_date - previous_coupon_date)
+
+
+def _thirty_360(previous_coupon_date, settlement_date, next_coupon_date, coupon_frequency):
+    """30/360 US (NASD): 30-day months, 360 / frequency days per coupon period and DSC = E - A."""
+    days_accrued = _days_360(previous_coupon_date, settlement_date)
+    days_in_period = 360 / coupon_frequency
+    return days_accrued, days_in_period - days_accrued, days_in_period
+
+
+def _actual_365(previous_coupon_date, settlement_date, next_coupon_date, coupon_frequency):
+    """ACT/365 (fixed): actual days, over 365 / frequency days per coupon period."""
+    return abs(settlement_date - previous_coupon_date), abs(next_coupon_date - settlement_date), 365 / coupon_frequency
+
+
+def _actual_360(previous_coupon_date, settlement_date, next_coupon_date, coupon_frequency):
+    """ACT/360: actual days, over 360 / frequency days per coupon period."""
+    return abs(settlement_date - previous_coupon_date), abs(next_coupon_date - settlement_date), 360 / coupon_frequency
+
+
+# Day count conventions by name. Each takes the previous coupon, settlement and next coupon date ordinals
+# (ints or integer arrays) and the coupon frequency, and returns (A, DSC, E): the days accrued since the
+# previous coupon date, the days from settlement to the next coupon date and the days in the coupon period
+DAY_COUNTS = {
+    'ACT/ACT': _actual_actual,
+    'ACT/ACT ICMA': _actual_actual,
+    '30/360': _thirty_360,
+    'ACT/365': _actual_365,
+    'ACT/360': _actual_360,
+}
+
+
+def _day_count(name):
+    """
+    Returns the day count function registered under a name.
+
+    Args:
+        name (str): The day count convention, a key of DAY_COUNTS.
+
+    Returns:
+        function: The day count function.
+    """
+    try:
+        return DAY_COUNTS[name]
+    except (KeyError, TypeError):
+        raise ValueError(f"Unknown day count convention {name!r}, expected one of {', '.join(DAY_COUNTS)}") from None
+
+
+def _day_count_batch(day_count, previous_coupon_date, settlement_date, next_coupon_date, coupon_frequency):
+    """
+    Applies one day count convention, or one per bond, to whole arrays of date ordinals.
+
+    Args:
+        day_count (str or array-like): The convention name, or one name per bond.
+        previous_coupon_date (numpy.ndarray): The previous coupon date ordinals.
+        settlement_date (numpy.ndarray): The settlement date ordinals.
+        next_coupon_date (numpy.ndarray): The next coupon date ordinals.
+        coupon_frequency (numpy.ndarray): The number of coupon payments per year.
+
+    Returns:
+        tuple: (A, DSC, E) float arrays.
+    """
+    day_count = np.asarray(day_count)
+    if day_count.ndim == 0:
+        days = _day_count(day_count.item())(previous_coupon_date, settlement_date, next_coupon_date, coupon_frequency)
+        return tuple(np.broadcast_to(np.asarray(value, dtype=np.float64), settlement_date.shape) for value in days)
+    day_count = np.broadcast_to(day_count, settlement_date.shape)
+    days = np.empty((3,) + settlement_date.shape)
+    for name in np.unique(day_count):
+        mask = day_count == name
+        days[:, mask] = _day_count(name.item())(previous_coupon_date[mask], settlement_date[mask], next_coupon_date[mask], coupon_frequency[mask])
+    return days[0], days[1], days[2]
+
+
+# Columns of the amortization table as a NumPy structured array (coupon_no is fractional on the settlement row)
+AMORTIZATION_DTYPE = np.dtype([
+    ('coupon_no', np.float64), ('beginning_date', 'datetime64[D]'), ('open_bond_value', np.float64),
+    ('interest_payment', np.float64), ('coupon_payment', np.float64), ('closing_bond_value', np.float64), ('end_date', 'datetime64[D]'),
+])
+
+
+class _cached_slot:
+    """
+    Computes a Bond attribute on first access and caches it in a private slot named '_' + attribute.
+
+    Works like functools.cached_property for classes that use __slots__ and have no __dict__.
+    """
+
+    def __init__(self, method):
+        self.method = method
+        self.__doc__ = method.__doc__
+
+    def __set_name__(self, owner, name):
+        self.slot = getattr(owner, '_' + name)  # The member descriptor created by __slots__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            return self.slot.__get__(instance, owner)
+        except AttributeError:
+            value = self.method(instance)
+            self.slot.__set__(instance, value)
+            return value
+
+
+class Bond:
+  # Inputs are stored directly; every derived field is computed on first access and cached in its '_' slot
+  __slots__ = ('face_value', 'coupon_rate', 'yield_rate', 'coupon_frequency', 'maturity_date', 'settlement_date', 'day_count',
+               '_base_coupon_payments', '_coupon_schedule', '_coupon_dates', '_no_of_payment', '_day_counts', '_DSC', '_E', '_A', '_cash_flows', '_dirty_price',
+               '_bond_value', '_accrued_int', '_clean_price', '_bond_type', '_compound_frequency', '_risk_measures')
+  base_price = 100
+
+  def __init__(self, face_value, coupon_rate, yield_rate, coupon_frequency, maturity_date, settlement_date, day_count='ACT/ACT'):
+    self.face_value = face_value
+    self.coupon_rate = coupon_rate
+    self.yield_rate = yield_rate
+    self.coupon_frequency = coupon_frequency
+    self.maturity_date = maturity_date
+    self.settlement_date = settlement_date
+    self.day_count = day_count   # Day count convention, a key of DAY_COUNTS
+
+
+  @_cached_slot
+  def base_coupon_payments(self):
+    """Coupon payment base on 100."""
+    return self.__calculate_coupon_payments(self.base_price)
+
+  @_cached_slot
+  def coupon_schedule(self):
+    """Shared coupon date ordinals of the bond and the index of the coupon date on or before settlement."""
+    with INSTRUMENTATION.stage('schedule'):
+      return SCHEDULE_CACHE.window(self.maturity_date, self.coupon_frequency, self.settlement_date)
+
+  @_cached_slot
+  def coupon_dates(self):
+    """Dictionary which has the settlement date and all coupon dates from the most recent coupon date to maturity."""
+    return self.__generate_coupon_dates()
+
+  @_cached_slot
+  def no_of_payment(self):
+    """No of coupon payments."""
+    ordinals, index = self.coupon_schedule
+    with INSTRUMENTATION.stage('day_count'):
+      return self.__calculate_no_compounding_periods(datetime.date.fromordinal(ordinals[index]), self.maturity_date, self.coupon_frequency)
+
+  @_cached_slot
+  def day_counts(self):
+    """Days accrued, days to the next coupon date and days in the coupon period under the bond's day count convention."""
+    ordinals, index = self.coupon_schedule
+    with INSTRUMENTATION.stage('day_count'):
+      return _day_count(self.day_count)(ordinals[index], self.settlement_date.toordinal(), ordinals[index+1], self.coupon_frequency)
+
+  @_cached_slot
+  def DSC(self):
+    """No of days from settlement date to next coupon date."""
+    return self.day_counts[1]
+
+  @_cached_slot
+  def E(self):
+    """No of days in the coupon period in which the settlement date falls."""
+    return self.day_counts[2]
+
+  @_cached_slot
+  def A(self):
+    """No of days from the previous coupon date to settlement date."""
+    return self.day_counts[0]
+
+  @_cached_slot
+  def cash_flows(self):
+    """Present value and time-weighted sums of the cash flows."""
+    # Resolve the lazy schedule and day counts first, so the pricing stage times the discounting only
+    coupon_pmt, no_of_payment, DSC, E = self.base_coupon_payments, self.no_of_payment, self.DSC, self.E
+    with INSTRUMENTATION.stage('pricing'):
+      return self.__discount_cash_flows(coupon_pmt,self.base_price,no_of_payment,DSC,E)
+
+  @_cached_slot
+  def dirty_price(self):
+    """Dirty price base on 100."""
+    present_value = self.cash_flows['present_value']
+    with INSTRUMENTATION.stage('rounding'):
+      return round_number(present_value,4)
+
+  @_cached_slot
+  def bond_value(self):
+    """Total value of the bond."""
+    return self.__get_bond_value(self.face_value, self.dirty_price)
+
+  @_cached_slot
+  def accrued_int(self):
+    """Accrued interest base on 100."""
+    A, E = self.A, self.E
+    with INSTRUMENTATION.stage('rounding'):
+      return self.__accrued_int(self.base_coupon_payments,A,E)
+
+  @_cached_slot
+  def clean_price(self):
+    """Clean price base on 100."""
+    return self.dirty_price - self.accrued_int
+
+  @_cached_slot
+  def bond_type(self):
+    """Premium, discounted or par bond."""
+    return 'Premium Bond' if self.coupon_rate > self.yield_rate else 'Discounted Bond' if self.coupon_rate < self.yield_rate else 'Par Bond'
+
+  @_cached_slot
+  def compound_frequency(self):
+    """Compound frequency name."""
+    return self.__compound_period()
+
+  @_cached_slot
+  def risk_measures(self):
+    """Macaulay duration, modified duration, convexity and DV01 from the same discounting pass as the price."""
+    return self.__risk_measures(self.cash_flows)
+
+  @property
+  def macaulay_duration(self):
+    return self.risk_measures[0]
+
+  @property
+  def modified_duration(self):
+    return self.risk_measures[1]
+
+  @property
+  def convexity(self):
+    return self.risk_measures[2]
+
+  @property
+  def dv01(self):
+    return self.risk_measures[3]
+
+
+  def __calculate_coupon_payments(self,face_value):
+    """Calculate the coupon payment amount based on the face value, coupon rate, and coupon frequency.
+
+    Args:
+        face_value (float): The face value of the bond.
+
+    Returns:
+        float: The coupon payment amount.
+    """
+    coupon_pmt = face_value * self.coupon_rate / self.coupon_frequency
+    return coupon_pmt
+
+  def __compound_period(self):
+    """Calculate the compound period based on the coupon frequency.
+
+    Returns:
+        str: The compound period (e.g., "Monthly", "Quarterly", "Semi-Annual", "Annual").
+    """
+    compound_period = "Monthly" if self.coupon_frequency == 12 else "Quarterly" if self.coupon_frequency == 4 else "Semi-Annual" if self.coupon_frequency == 2 else "Annual"
+    return compound_period
+
+
+  def __discount_cash_flows(self,coupon_pmt,redemption,no_of_payment,DSC,E):
+    """Discount the bond cash flows at the yield rate, keeping the sums needed for duration and convexity.
+
+    A cash flow CF paid T = n-1+DSC/E periods away adds CF*v**T to the present value, T*CF*v**T to the
+    time-weighted sum and T*(T+1)*CF*v**T to the convexity-weighted sum, with v = 1/(1+y/f).
+
+    Args:
+        coupon_pmt (float): The coupon payment amount.
+        redemption (float): The redemption amount.
+        no_of_payment (int): The number of remaining coupon payments.
+        DSC (int): The number of days from the settlement date to the next coupon date.
+        E (int): The number of days in the coupon period.
+
+    Returns:
+        dict: A dictionary containing the present value (unrounded), time-weighted sum and convexity-weighted sum.
+    """
+    period_yield = self.yield_rate/self.coupon_frequency
+    period_fraction = DSC/E
+    redemption_time = no_of_payment-1+period_fraction
+    pv_redemption = redemption / ((1 + period_yield) ** redemption_time)
+    coupon_factor = coupon_pmt / ((1 + period_yield) ** period_fraction)
+
+    # The coupons form a geometric series, so their present value is coupon_pmt * v**(DSC/E) * (1 - v**N) / (1 - v)
+    if period_yield == 0:
+      annuity = no_of_payment
+    else:
+      log_discount = -math.log1p(period_yield)
+      annuity = math.expm1(no_of_payment * log_discount) / math.expm1(log_discount)
+
+    # S1 = sum(n * v**n) and S2 = sum(n**2 * v**n) for n = 0..N-1, summed term by term near a zero yield where the closed forms cancel
+    discount = 1 / (1 + period_yield)
+    if abs(period_yield) < _SMALL_PERIOD_YIELD:
+      s1 = sum(n * discount ** n for n in range(no_of_payment))
+      s2 = sum(n * n * discount ** n for n in range(no_of_payment))
+    else:
+      one_minus = -math.expm1(-math.log1p(period_yield))
+      power = discount ** no_of_payment
+      s1 = discount * (1 - no_of_payment * power / discount + (no_of_payment - 1) * power) / one_minus ** 2
+      s2 = discount * (1 + discount - no_of_payment ** 2 * power / discount + (2 * no_of_payment ** 2 - 2 * no_of_payment - 1) * power
+                       - (no_of_payment - 1) ** 2 * power * discount) / one_minus ** 3
+
+    return {
+      'present_value': pv_redemption + coupon_factor * annuity,
+      'time_weighted': coupon_factor * (s1 + period_fraction * annuity) + redemption_time * pv_redemption,
+      'convexity_weighted': coupon_factor * (s2 + (2 * period_fraction + 1) * s1 + period_fraction * (period_fraction + 1) * annuity)
+                            + redemption_time * (redemption_time + 1) * pv_redemption,
+    }
+
+
+  def __risk_measures(self,cash_flows):
+    """Calculate the Macaulay duration, modified duration, convexity and DV01 of the bond.
+
+    Args:
+        cash_flows (dict): The discounted cash flow sums from __discount_cash_flows.
+
+    Returns:
+        tuple: Macaulay duration (years), modified duration, convexity and DV01 (change in bond value for a one basis point fall in yield).
+    """
+    present_value = cash_flows['present_value']
+    period_yield = self.yield_rate/self.coupon_frequency
+    macaulay_duration = cash_flows['time_weighted'] / (self.coupon_frequency * present_value)
+    modified_duration = macaulay_duration / (1 + period_yield)
+    convexity = cash_flows['convexity_weighted'] / ((self.coupon_frequency * (1 + period_yield)) ** 2 * present_value)
+    dv01 = modified_duration * self.__get_bond_value(self.face_value, present_value) / 10000
+    return macaulay_duration, modified_duration, convexity, dv01
+
+
+  def __accrued_int(self,coupon_pmt,A,E):
+    """Calculate the accrued interest on the bond.
+
+    Args:
+        coupon_pmt (float): The coupon payment amount.
+        A (int): The number of days since the last coupon payment.
+        E (int): The number of days in the coupon period.
+
+    Returns:
+        float: The accrued interest amount.
+    """
+    return round_number((coupon_pmt * A / E),4)
+
+
+  def __generate_coupon_dates(self):
+    """
+    Generates a list of coupon payment dates (as datetime.date objects) from settlement until maturity,
+    from the shared coupon schedule.
+
+    Returns:
+        dict: A dictionary containing the settlement date and a list of coupon payment dates.
+    """
+    ordinals, index = self.coupon_schedule
+    return {'settlement_date': self.settlement_date, 'coupon_dates': [datetime.date.fromordinal(ordinal) for ordinal in ordinals[index:]]}
+
+
+  def __calculate_no_compounding_periods(self, start_date, end_date, compounding_frequency):
+    """Calculates the number of compounding periods between two dates.
+
+    Args:
+        start_date (datetime.date): The start date.
+        end_date (datetime.date): The end date.
+        compounding_frequency (int): The number of times compounding occurs per year.
+
+    Returns:
+        int: The number of compounding periods.
+    """
+    total_months = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month)
+    compounding_periods = int(math.ceil(total_months / (12 / compounding_frequency))) # calculate the no periods between two dates and round up the result
+    return compounding_periods
+
+
+  def __get_bond_value(self,face_value, dirty_price):
+    """
+    Get the bond value based on the dirty price.
+
+    Args:
+        dirty_price (float): The dirty price of the bond.
+
+    Returns:
+        float: The bond value.
+    """
+    return dirty_price * face_value / self.base_price
+
+
+  @_instrumented('amortization')
+  def get_bond_amortization_table(self):
+    """
+    Calculate the amortization table for the bond.
+
+    Returns:
+        list: A list of lists containing the amortization table data.
+        Each inner list represents a row in the table and contains the following elements:
+        - Coupon Number
+        - Beginning Date
+        - Open Bond Value
+        - Interest Payment
+        - Coupon Payment
+        - End Bond Value
+        - End Date
+    """
+    coupon_dates = self.coupon_dates['coupon_dates']                            # All coupon dates until maturiry (read only, the list is cached)
+    settlement_date = self.coupon_dates['settlement_date']                      # Settlement date
+    redemption = self.base_price                                                # Base redemption price which is 100
+    base_coupon_payment = self.base_coupon_payments                             # Coupon payment base on face value 100
+    face_value = self.face_value                                                # Actual Face value
+    coupon_payment = self.__calculate_coupon_payments(face_value)               # Actual coupon payment base on actual face value
+
+    # Price on each coupon date with one backward pass: value_k = (value_k+1 + coupon) / (1 + y/f), starting from the redemption at maturity
+    no_of_payment= len(coupon_dates)
+    dirty_prices = [float(redemption)] * no_of_payment
+    for n in range(no_of_payment-2, -1, -1):
+      dirty_prices[n] = (dirty_prices[n+1] + base_coupon_payment) / (1 + (self.yield_rate/self.coupon_frequency))
+
+    # create initial amortization shedule with date and bond value
+    amortization_table = []
+    for coupon_no, date in enumerate(coupon_dates):
+      dirty_price = round_number(dirty_prices[coupon_no],4)
+      bond_value = self.__get_bond_value(face_value, dirty_price)
+      amortization_table.append([coupon_no, date, bond_value])
+
+    # append each row of amortization shedule with interest payament, coupon payment, end bond value and end date
+    no_of_periods = len(amortization_table)
+    for index, row in enumerate(amortization_table[:-1]):
+      next_bond_value = amortization_table[index+1][2]
+      current_bond_value = row[2]
+      interest = next_bond_value - current_bond_value + coupon_payment
+      next_coupon_date = amortization_table[index+1][1]
+      amortization_table[index].append(interest)
+      amortization_table[index].append(coupon_payment)
+      amortization_table[index].append(next_bond_value)
+      amortization_table[index].append(next_coupon_date)
+
+    # Delete the last item in the amortization shedule which is the face value. This is added to the end value of the previoust row
+    maturity_row = amortization_table.pop()
+
+    if settlement_date != amortization_table[0][1]:
+      coupon_no = round_number(self.DSC/self.E,2)
+
+      # Change the interest, coupon,end value and end date of first coupon to adjest the settelement date
+      intrest_to_settle_date = self.bond_value - amortization_table[0][2]
+      amortization_table[0][3] = intrest_to_settle_date
+      amortization_table[0][4] = 0
+      amortization_table[0][5] = self.bond_value
+      amortization_table[0][6] = settlement_date
+
+      # Add new entry to settlement date values (in the final coupon period the next row is the redemption at maturity)
+      next_row = amortization_table[1] if len(amortization_table) > 1 else maturity_row
+      intrest_to_next_coupon_date = next_row[2] - self.bond_value  + coupon_payment
+      end_bond_value = next_row[2]
+      next_coupon_date = next_row[1]
+      amortization_table.insert(1,[coupon_no,settlement_date,self.bond_value,intrest_to_next_coupon_date,coupon_payment,end_bond_value,next_coupon_date])
+
+    return amortization_table
+
+  def get_amortization_array(self):
+    """
+    Returns the amortization table as a columnar NumPy structured array (dtype AMORTIZATION_DTYPE).
+
+    The rows are the same as get_bond_amortization_table; dates are datetime64[D] and amounts float64,
+    so columns can be sliced without touching Python objects, e.g. table['closing_bond_value'].
+
+    Returns:
+        numpy.ndarray: The amortization table.
+    """
+    return np.array([tuple(row) for row in self.get_bond_amortization_table()], dtype=AMORTIZATION_DTYPE)
+
+
+  def yield_from_price(self, clean_price=None):
+    """
+    Solves the yield to maturity implied by a clean price, keeping the bond's schedule.
+
+    Args:
+        clean_price (float, optional): The quoted clean price (base 100). Defaults to the bond's own clean price.
+
+    Returns:
+        float: The annual yield rate (decimal).
+    """
+    clean_price = self.clean_price if clean_price is None else clean_price
+    solution = _solve_yield(np.array([clean_price + self.accrued_int]), np.array([self.base_coupon_payments]),
+                            np.array([float(self.base_price)]), np.array([self.coupon_frequency]),
+                            np.array([self.no_of_payment]), np.array([self.DSC / self.E]))
+    if not solution['converged'][0]:
+      raise ValueError(f"Yield did not converge for clean price {clean_price}")
+    return float(solution['yield_rate'][0])
+
+  def value_over_dates(self, start_date=None, end_date=None, step=1):
+    """
+    Values the bond on a series of settlement dates, keeping its coupon rate and yield.
+
+    The coupon schedule is built once from the bond's shared schedule. The sorted settlement dates are
+    matched to their coupon periods with one search over the schedule, so the coupon-period pointer only
+    moves forward, and DSC/E, the number of payments, accrued interest and the prices are computed for
+    every date in one vectorized pass.
+
+    Args:
+        start_date (datetime.date, optional): The first settlement date. Defaults to the bond's settlement date.
+        end_date (datetime.date, optional): The last settlement date. Defaults to the day before maturity.
+        step (int or str, optional): Days between settlement dates, or 'B' for every business day (Monday to Friday). Defaults to 1.
+
+    Returns:
+        dict: A dictionary of arrays with the settlement dates (datetime64[D]), number of payments, DSC, E,
+        dirty price, accrued interest, clean price (all base 100) and bond value.
+    """
+    start_date = np.datetime64(start_date or self.settlement_date, 'D')
+    end_date = np.datetime64(end_date or self.maturity_date - datetime.timedelta(days=1), 'D')
+    if end_date >= np.datetime64(self.maturity_date, 'D'):
+      raise ValueError(f"End date {end_date} must be before the maturity date {self.maturity_date}")
+    if step == 'B':
+      settlement_dates = np.arange(start_date, end_date + 1, dtype='datetime64[D]')
+      settlement_dates = settlement_dates[np.is_busday(settlement_dates)]
+    else:
+      settlement_dates = np.arange(start_date, end_date + 1, step, dtype='datetime64[D]')
+
+    # Coupon date on or before each settlement date, and the coupon date after it
+    ordinals, _ = SCHEDULE_CACHE.window(self.maturity_date, self.coupon_frequency, start_date.astype(object))
+    coupon_dates = np.frombuffer(ordinals, dtype=np.int32).astype(np.int64)
+    settlement = settlement_dates.astype(np.int64) + _EPOCH_ORDINAL
+    index = np.minimum(np.searchsorted(coupon_dates, settlement, side='right') - 1, coupon_dates.size - 2)
+    previous_coupon_date = coupon_dates[index]
+    next_coupon_date = coupon_dates[index + 1]
+
+    months_interval = 12 // self.coupon_frequency
+    total_months = _month_index(np.datetime64(self.maturity_date, 'D'))[0] - _month_index((previous_coupon_date - _EPOCH_ORDINAL).astype('datetime64[D]'))[0]
+    no_of_payment = -(-total_months // months_interval)      # No of coupon payments, rounded up
+    A, DSC, E = _day_count(self.day_count)(previous_coupon_date, settlement, next_coupon_date, self.coupon_frequency)
+
+    present_value = _present_value(self.base_coupon_payments, self.base_price, self.yield_rate / self.coupon_frequency, no_of_payment, DSC / E)
+    dirty_price = round_array(present_value, 4)
+    accrued_int = round_array(self.base_coupon_payments * A / E, 4)
+    return {
+      'settlement_date': settlement_dates,
+      'no_of_payment': no_of_payment,
+      'DSC': np.broadcast_to(DSC, settlement.shape),
+      'E': np.broadcast_to(E, settlement.shape),
+      'dirty_price': dirty_price,
+      'accrued_int': accrued_int,
+      'clean_price': dirty_price - accrued_int,
+      'bond_value': dirty_price * self.face_value / self.base_price,
+    }
+
+  def repricer(self):
+    """
+    Returns a BondRepricer holding this bond's yield-independent fields, for cheap repricing on yield ticks.
+
+    Returns:
+        BondRepricer: The repricing handle.
+    """
+    return BondRepricer(self)
+
+
+class BondRepricer:
+    """
+    Reprices one bond at new yields, keeping everything that does not depend on the yield.
+
+    The coupon amount, number of payments, DSC/E and accrued interest are taken from the bond once,
+    so each reprice only repeats the discounting step. The prices match Bond(..., yield_rate, ...).
+    """
+    __slots__ = ('face_value', 'coupon_frequency', 'base_coupon_payments', 'no_of_payment', 'period_fraction', 'accrued_int')
+    base_price = 100
+
+    def __init__(self, bond):
+        self.face_value = bond.face_value
+        self.coupon_frequency = bond.coupon_frequency
+        self.base_coupon_payments = bond.base_coupon_payments  # Coupon payment base on 100
+        self.no_of_payment = bond.no_of_payment                # No of coupon payments
+        self.period_fraction = bond.DSC / bond.E               # Fraction of a period to the next coupon date
+        self.accrued_int = bond.accrued_int                    # Accrued interest base on 100
+
+    def reprice(self, yield_rate):
+        """
+        Values the bond at a new yield.
+
+        Args:
+            yield_rate (float): The annual yield rate (decimal).
+
+        Returns:
+            dict: A dictionary containing the dirty price, clean price (base 100) and bond value.
+        """
+        period_yield = yield_rate / self.coupon_frequency
+        if period_yield == 0:
+            annuity = self.no_of_payment
+        else:
+            log_discount = -math.log1p(period_yield)
+            annuity = math.expm1(self.no_of_payment * log_discount) / math.expm1(log_discount)
+        present_value = (self.base_price / ((1 + period_yield) ** (self.no_of_payment - 1 + self.period_fraction))
+                         + self.base_coupon_payments / ((1 + period_yield) ** self.period_fraction) * annuity)
+        dirty_price = round_number(present_value, 4)
+        return {
+            'dirty_price': dirty_price,
+            'clean_price': dirty_price - self.accrued_int,
+            'bond_value': dirty_price * self.face_value / self.base_price,
+        }
+
+    def reprice_many(self, yield_rates):
+        """
+        Values the bond at many yields in one vectorized pass.
+
+        Args:
+            yield_rates (array-like): The annual yield rates (decimal).
+
+        Returns:
+            dict: A dictionary of arrays with the dirty price, clean price (base 100) and bond value.
+        """
+        period_yield = np.asarray(yield_rates, dtype=np.float64) / self.coupon_frequency
+        dirty_price = round_array(_present_value(self.base_coupon_payments, self.base_price, period_yield,
+                                                 self.no_of_payment, self.period_fraction), 4)
+        return {
+            'dirty_price': dirty_price,
+            'clean_price': dirty_price - self.accrued_int,
+            'bond_value': dirty_price * self.face_value / self.base_price,
+        }
+
+
+# ========================================================================================================================================================================================================================================================================
+_MONTH_DAYS = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])  # Days in each month of a non-leap year
+
+
+def _to_datetime64(dates):
+    """
+    Converts a date, a sequence of dates or a datetime64 array to a datetime64[D] array.
+
+    Args:
+        dates: datetime.date, 'YYYY-MM-DD' string, sequence of these or a numpy datetime64 array.
+
+    Returns:
+        numpy.ndarray: The dates as a datetime64[D] array.
+    """
+    return np.asarray(dates, dtype='datetime64[D]')
+
+
+def _month_index(dates):
+    """
+    Splits datetime64[D] dates into a month index (months since 0000-01) and day of month.
+
+    Args:
+        dates (numpy.ndarray): The datetime64[D] dates.
+
+    Returns:
+        tuple: (month_index, day) integer arrays.
+    """
+    months = dates.astype('datetime64[M]')
+    day = (dates - months).astype(np.int64) + 1
+    month_index = months.astype(np.int64) + 1970 * 12
+    return month_index, day
+
+
+def _days_in_month(month_index):
+    """
+    Returns the number of days in each month given as a month index (months since 0000-01).
+
+    Args:
+        month_index (numpy.ndarray): The month indexes.
+
+    Returns:
+        numpy.ndarray: The number of days in each month.
+    """
+    year, month = np.divmod(month_index, 12)
+    leap_year = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    return _MONTH_DAYS[month] + ((month == 1) & leap_year)
+
+
+def _date_from_month_index(month_index, day):
+    """
+    Builds datetime64[D] dates from a month index (months since 0000-01) and day of month.
+
+    Args:
+        month_index (numpy.ndarray): The month indexes.
+        day (numpy.ndarray): The day of month of each date.
+
+    Returns:
+        numpy.ndarray: The dates as a datetime64[D] array.
+    """
+    months = (month_index - 1970 * 12).astype('datetime64[M]')
+    return months.astype('datetime64[D]') + (day - 1)
+
+
+def _coupon_day_after_steps(maturity_month, maturity_day, months_interval, steps):
+    """
+    Returns the day of month of the coupon date reached after stepping back `steps` coupon periods from maturity.
+
+    _add_months clamps the day to the month length on every step, so the day can only ever shrink
+    along the walk. Every month the walk can reach is visited within 24 months, after which the day is stable.
+
+    Args:
+        maturity_month (numpy.ndarray): Month index of the maturity dates.
+        maturity_day (numpy.ndarray): Day of month of the maturity dates.
+        months_interval (numpy.ndarray): Number of months in each coupon period.
+        steps (numpy.ndarray): Number of coupon periods stepped back from maturity.
+
+    Returns:
+        numpy.ndarray: The day of month of each coupon date.
+    """
+    day = maturity_day.copy()
+    limit = np.minimum(steps, 24 // months_interval)
+    for step in range(1, int(limit.max(initial=0)) + 1):
+        month_days = _days_in_month(maturity_month - step * months_interval)
+        day = np.where(step <= limit, np.minimum(day, month_days), day)
+    return np.minimum(day, _days_in_month(maturity_month - steps * months_interval))
+
+
+def _coupon_window(maturity_date, settlement_date, coupon_frequency):
+    """
+    Finds the coupon period in which each settlement date falls, matching the coupon schedules used by Bond.
+
+    Args:
+        maturity_date (numpy.ndarray): The datetime64[D] maturity dates.
+        settlement_date (numpy.ndarray): The datetime64[D] settlement dates.
+        coupon_frequency (numpy.ndarray): The number of coupon payments per year.
+
+    Returns:
+        dict: A dictionary containing the previous coupon dates, next coupon dates and number of coupon payments.
+    """
+    if np.any(12 % coupon_frequency != 0):
+        raise ValueError("Coupon frequency must be one of 1, 2, 3, 4, 6 or 12")
+
+    months_interval = 12 // coupon_frequency
+    maturity_month, maturity_day = _month_index(maturity_date)
+    settlement_month, settlement_day = _month_index(settlement_date)
+
+    # Step back the number of periods that reaches the settlement month, and one more when that date is still after settlement
+    steps = np.maximum(-((settlement_month - maturity_month) // months_interval), 0)
+    day = _coupon_day_after_steps(maturity_month, maturity_day, months_interval, steps)
+    candidate = _date_from_month_index(maturity_month - steps * months_interval, day)
+    steps = np.maximum(np.where(candidate > settlement_date, steps + 1, steps), 1)
+
+    previous_day = _coupon_day_after_steps(maturity_month, maturity_day, months_interval, steps)
+    next_day = _coupon_day_after_steps(maturity_month, maturity_day, months_interval, steps - 1)
+    return {
+        'previous_coupon_date': _date_from_month_index(maturity_month - steps * months_interval, previous_day),
+        'next_coupon_date': _date_from_month_index(maturity_month - (steps - 1) * months_interval, next_day),
+        'no_of_payment': steps,
+    }
+
+
+def _present_value(coupon_pmt, redemption, period_yield, no_of_payment, period_fraction):
+    """
+    Vectorized closed form of the present value in Bond.__discount_cash_flows (unrounded).
+
+    The coupons form a geometric series, so their present value is
+    coupon_pmt * v**t * (1 - v**N) / (1 - v) with v = 1 / (1 + y/f) and t = DSC/E.
+
+    Args:
+        coupon_pmt (numpy.ndarray): The coupon payment amounts.
+        redemption (numpy.ndarray): The redemption amounts.
+        period_yield (numpy.ndarray): The yield per coupon period (yield_rate / coupon_frequency).
+        no_of_payment (numpy.ndarray): The number of remaining coupon payments.
+        period_fraction (numpy.ndarray): The fraction of a period to the next coupon date (DSC/E).
+
+    Returns:
+        numpy.ndarray: The present value of the bond cash flows.
+    """
+    log_discount = -np.log1p(period_yield)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annuity = np.where(period_yield == 0, no_of_payment,
+                           np.expm1(no_of_payment * log_discount) / np.expm1(log_discount))
+    pv_redemption = redemption * np.exp((no_of_payment - 1 + period_fraction) * log_discount)
+    pv_coupon = coupon_pmt * np.exp(period_fraction * log_discount) * annuity
+    return pv_redemption + pv_coupon
+
+
+_SMALL_PERIOD_YIELD = 1e-3  # Below this period yield the closed-form moment sums lose precision and are summed term by term
+_MOMENT_CHUNK = 10000       # Bonds summed term by term at a time, to bound the size of the padded period grid
+
+
+def _annuity_moments(period_yield, no_of_payment):
+    """
+    Returns the sums S0 = sum(v**n), S1 = sum(n * v**n) and S2 = sum(n**2 * v**n) for n = 0..N-1 with v = 1 / (1 + y/f).
+
+    Args:
+        period_yield (numpy.ndarray): The yield per coupon period.
+        no_of_payment (numpy.ndarray): The number of remaining coupon payments.
+
+    Returns:
+        tuple: (S0, S1, S2) arrays.
+    """
+    discount = 1 / (1 + period_yield)
+    one_minus = -np.expm1(-np.log1p(period_yield))
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        power = discount ** no_of_payment
+        n_squared = no_of_payment ** 2
+        s0 = -np.expm1(no_of_payment * np.log(discount)) / one_minus
+        s1 = discount * (1 - no_of_payment * power / discount + (no_of_payment - 1) * power) / one_minus ** 2
+        s2 = discount * (1 + discount - n_squared * power / discount + (2 * n_squared - 2 * no_of_payment - 1) * power
+                         - (no_of_payment - 1) ** 2 * power * discount) / one_minus ** 3
+
+    # Near a zero yield the closed forms cancel, so sum those bonds over a padded grid of periods
+    small = np.flatnonzero(np.abs(period_yield) < _SMALL_PERIOD_YIELD)
+    for start in range(0, small.size, _MOMENT_CHUNK):
+        rows = small[start:start + _MOMENT_CHUNK]
+        n = np.arange(no_of_payment[rows].max(initial=0))
+        weights = np.where(n < no_of_payment[rows, None], discount[rows, None] ** n, 0.0)
+        # Sequential sums, so the result doesn't depend on how much padding the other bonds in the chunk need
+        s0[rows] = np.cumsum(weights, axis=1)[:, -1]
+        s1[rows] = np.cumsum(weights * n, axis=1)[:, -1]
+        s2[rows] = np.cumsum(weights * n * n, axis=1)[:, -1]
+    return s0, s1, s2
+
+
+def _discount_cash_flows(coupon_pmt, redemption, period_yield, no_of_payment, period_fraction):
+    """
+    Discounts the bond cash flows in one pass, returning the present value with the sums needed for risk.
+
+    A cash flow CF paid T = n - 1 + DSC/E periods away contributes CF * v**T to the present value,
+    T * CF * v**T to the time-weighted sum and T * (T + 1) * CF * v**T to the convexity-weighted sum.
+
+    Args:
+        coupon_pmt (numpy.ndarray): The coupon payment amounts.
+        redemption (numpy.ndarray): The redemption amounts.
+        period_yield (numpy.ndarray): The yield per coupon period (yield_rate / coupon_frequency).
+        no_of_payment (numpy.ndarray): The number of remaining coupon payments.
+        period_fraction (numpy.ndarray): The fraction of a period to the next coupon date (DSC/E).
+
+    Returns:
+        tuple: (present value, time-weighted sum, convexity-weighted sum) arrays.
+    """
+    s0, s1, s2 = _annuity_moments(period_yield, no_of_payment)
+    log_discount = -np.log1p(period_yield)
+    redemption_time = no_of_payment - 1 + period_fraction
+    pv_redemption = redemption * np.exp(redemption_time * log_discount)
+    coupon_factor = coupon_pmt * np.exp(period_fraction * log_discount)
+    present_value = _present_value(coupon_pmt, redemption, period_yield, no_of_payment, period_fraction)
+    time_weighted = coupon_factor * (s1 + period_fraction * s0) + redemption_time * pv_redemption
+    convexity_weighted = (coupon_factor * (s2 + (2 * period_fraction + 1) * s1 + period_fraction * (period_fraction + 1) * s0)
+                          + redemption_time * (redemption_time + 1) * pv_redemption)
+    return present_value, time_weighted, convexity_weighted
+
+
+def _risk_measures(present_value, time_weighted, convexity_weighted, period_yield, coupon_frequency, face_value, base_price):
+    """
+    Converts the discounted cash flow sums into Macaulay duration, modified duration, convexity and DV01.
+
+    Args:
+        present_value (numpy.ndarray): The unrounded dirty prices.
+        time_weighted (numpy.ndarray): The time-weighted sums from _discount_cash_flows.
+        convexity_weighted (numpy.ndarray): The convexity-weighted sums from _discount_cash_flows.
+        period_yield (numpy.ndarray): The yield per coupon period.
+        coupon_frequency (numpy.ndarray): The number of coupon payments per year.
+        face_value (numpy.ndarray): The face values of the bonds.
+        base_price (float): The base the prices are quoted on (100).
+
+    Returns:
+        dict: A dictionary containing the Macaulay duration (years), modified duration, convexity and
+        DV01 (change in bond value for a one basis point fall in yield).
+    """
+    macaulay_duration = time_weighted / (coupon_frequency * present_value)
+    modified_duration = macaulay_duration / (1 + period_yield)
+    convexity = convexity_weighted / ((coupon_frequency * (1 + period_yield)) ** 2 * present_value)
+    dv01 = modified_duration * present_value * face_value / base_price / 10000
+    return {
+        'macaulay_duration': macaulay_duration,
+        'modified_duration': modified_duration,
+        'convexity': convexity,
+        'dv01': dv01,
+    }
+
+
+def _present_value_slope(coupon_pmt, redemption, period_yield, no_of_payment, period_fraction):
+    """
+    Returns the derivative of the present value of the bond cash flows with respect to the period yield.
+
+    Each cash flow paid T periods away contributes -T * CF * v**(T+1), with T = n - 1 + DSC/E.
+
+    Args:
+        coupon_pmt (numpy.ndarray): The coupon payment amounts.
+        redemption (numpy.ndarray): The redemption amounts.
+        period_yield (numpy.ndarray): The yield per coupon period (yield_rate / coupon_frequency).
+        no_of_payment (numpy.ndarray): The number of remaining coupon payments.
+        period_fraction (numpy.ndarray): The fraction of a period to the next coupon date (DSC/E).
+
+    Returns:
+        numpy.ndarray: dPV / d(period yield).
+    """
+    time_weighted = _discount_cash_flows(coupon_pmt, redemption, period_yield, no_of_payment, period_fraction)[1]
+    return -time_weighted / (1 + period_yield)
+
+
+def _solve_yield(dirty_price, coupon_pmt, redemption, coupon_frequency, no_of_payment, period_fraction,
+                 max_iterations=50, tolerance=1e-10):
+    """
+    Solves the yield that discounts the bond cash flows to the given dirty prices.
+
+    Newton steps use the analytic derivative of the price. Every evaluation also narrows a bracket
+    around the root (the price falls as the yield rises), and a step that leaves the bracket is
+    replaced with a bisection, so every bond converges within the iteration cap.
+
+    Args:
+        dirty_price (numpy.ndarray): The target dirty prices.
+        coupon_pmt (numpy.ndarray): The coupon payment amounts.
+        redemption (numpy.ndarray): The redemption amounts.
+        coupon_frequency (numpy.ndarray): The number of coupon payments per year.
+        no_of_payment (numpy.ndarray): The number of remaining coupon payments.
+        period_fraction (numpy.ndarray): The fraction of a period to the next coupon date (DSC/E).
+        max_iterations (int, optional): The maximum number of iterations. Defaults to 50.
+        tolerance (float, optional): The price tolerance relative to the target price. Defaults to 1e-10.
+
+    Returns:
+        dict: A dictionary containing the annual yields, iterations per bond, convergence flags,
+        total iterations run and elapsed seconds.
+    """
+    start_time = time.perf_counter()
+    dirty_price = np.asarray(dirty_price, dtype=np.float64)
+
+    # Bracket the period yield between -99% and 1000%, and start from the usual approximate yield
+    lower = np.full(dirty_price.shape, -0.99)
+    upper = np.full(dirty_price.shape, 10.0)
+    payments = np.maximum(no_of_payment, 1)
+    period_yield = (coupon_pmt + (redemption - dirty_price) / payments) / ((redemption + dirty_price) / 2)
+    period_yield = np.clip(np.nan_to_num(period_yield), lower / 2, upper / 2)
+
+    iterations = np.zeros(dirty_price.shape, dtype=np.int64)
+    converged = np.zeros(dirty_price.shape, dtype=bool)
+    active = np.flatnonzero(~converged)
+    iteration = 0
+    while active.size and iteration < max_iterations:
+        iteration += 1
+        args = (coupon_pmt[active], redemption[active], period_yield[active], no_of_payment[active], period_fraction[active])
+        error = _present_value(*args) - dirty_price[active]
+        slope = _present_value_slope(*args)
+        iterations[active] = iteration
+
+        done = np.abs(error) <= tolerance * np.maximum(np.abs(dirty_price[active]), 1)
+        converged[active[done]] = True
+
+        # The price is above target when the yield is too low
+        lower[active] = np.where(error > 0, period_yield[active], lower[active])
+        upper[active] = np.where(error < 0, period_yield[active], upper[active])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = period_yield[active] - error / slope
+        outside = ~np.isfinite(step) | (step <= lower[active]) | (step >= upper[active])
+        step = np.where(outside, (lower[active] + upper[active]) / 2, step)
+        period_yield[active] = np.where(done, period_yield[active], step)
+        active = active[~done]
+
+    return {
+        'yield_rate': period_yield * coupon_frequency,
+        'iterations': iterations,
+        'converged': converged,
+        'total_iterations': iteration,
+        'elapsed': time.perf_counter() - start_time,
+    }
+
+
+class BondBatch:
+    """
+    A portfolio of plain fixed-coupon bonds valued together with NumPy arrays.
+
+    Inputs are the same as Bond but given as arrays (scalars are broadcast), so a whole book is
+    priced in one vectorized pass instead of building one Bond object per position.
+    The results match the per-Bond numbers.
+    """
+
+    def __init__(self, face_value, coupon_rate, yield_rate, coupon_frequency, maturity_date, settlement_date, day_count='ACT/ACT'):
+        (self.face_value, self.coupon_rate, self.yield_rate, self.coupon_frequency,
+         self.maturity_date, self.settlement_date) = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(face_value, dtype=np.float64)),
+            np.asarray(coupon_rate, dtype=np.float64),
+            np.asarray(yield_rate, dtype=np.float64),
+            np.asarray(coupon_frequency, dtype=np.int64),
+            _to_datetime64(maturity_date),
+            _to_datetime64(settlement_date),
+        )
+        self.base_price = 100
+        self.day_count = day_count  # Day count convention (a key of DAY_COUNTS), or one per bond
+
+        with INSTRUMENTATION.stage('schedule'):
+            coupon_window = _coupon_window(self.maturity_date, self.settlement_date, self.coupon_frequency)
+        self.previous_coupon_date = coupon_window['previous_coupon_date']  # Coupon date on or before the settlement date
+        self.next_coupon_date = coupon_window['next_coupon_date']          # Coupon date after the settlement date
+        self.no_of_payment = coupon_window['no_of_payment']                # No of coupon payments
+        with INSTRUMENTATION.stage('day_count'):
+            self.A, self.DSC, self.E = _day_count_batch(   # Days accrued, days to the next coupon date and days in the coupon period
+                day_count, self.previous_coupon_date.astype(np.int64) + _EPOCH_ORDINAL, self.settlement_date.astype(np.int64) + _EPOCH_ORDINAL,
+                self.next_coupon_date.astype(np.int64) + _EPOCH_ORDINAL, self.coupon_frequency)
+        self._cash_flow_schedule = None  # Built on first use by cash_flow_schedule
+        self.base_coupon_payments = self.base_price * self.coupon_rate / self.coupon_frequency  # Coupon payment base on 100
+
+    def __len__(self):
+        return self.face_value.size
+
+    def price(self):
+        """
+        Values every bond in the batch.
+
+        Risk is computed analytically from the same discounting pass as the price.
+
+        Returns:
+            dict: A dictionary of arrays with the dirty price, accrued interest, clean price (all base 100), bond value,
+            Macaulay duration (years), modified duration, convexity and DV01 (bond value per basis point).
+        """
+        period_fraction = self.DSC / self.E
+        period_yield = self.yield_rate / self.coupon_frequency
+        with INSTRUMENTATION.stage('pricing'):
+            present_value, time_weighted, convexity_weighted = _discount_cash_flows(
+                self.base_coupon_payments, self.base_price, period_yield, self.no_of_payment, period_fraction)
+        dirty_price = round_array(present_value, 4)
+        accrued_int = round_array(self.base_coupon_payments * self.A / self.E, 4)
+        result = {
+            'dirty_price': dirty_price,
+            'accrued_int': accrued_int,
+            'clean_price': dirty_price - accrued_int,
+            'bond_value': dirty_price * self.face_value / self.base_price,
+        }
+        result.update(_risk_measures(present_value, time_weighted, convexity_weighted, period_yield,
+                                     self.coupon_frequency, self.face_value, self.base_price))
+        return result
+
+    def cash_flow_schedule(self):
+        """
+        Lays out the remaining cash flows of every bond in the batch as flat arrays, one entry per payment.
+
+        The layout depends only on the schedules, so it is built once and reused for every curve
+        the batch is priced against.
+
+        Returns:
+            dict: A dictionary containing the bond index, payment date (datetime64[D]) and amount (base 100) of each cash flow.
+        """
+        if self._cash_flow_schedule is None:
+            months_interval = 12 // self.coupon_frequency
+            maturity_month, maturity_day = _month_index(self.maturity_date)
+            bond_index = np.repeat(np.arange(len(self)), self.no_of_payment)
+            first_payment = np.cumsum(self.no_of_payment) - self.no_of_payment
+            steps = np.arange(bond_index.size) - first_payment[bond_index]  # Coupon periods back from maturity
+
+            # Day of month along each bond's walk back from maturity (as in _coupon_day_after_steps), per bond
+            # rather than per cash flow: the day is stable after 24 // months_interval steps
+            limit = 24 // months_interval
+            walk_day = np.empty((len(self), 25), dtype=np.int64)
+            walk_day[:, 0] = maturity_day
+            for step in range(1, 25):
+                month_days = _days_in_month(maturity_month - step * months_interval)
+                walk_day[:, step] = np.where(step <= limit, np.minimum(walk_day[:, step - 1], month_days), walk_day[:, step - 1])
+            month_index = maturity_month[bond_index] - steps * months_interval[bond_index]
+            day = np.minimum(walk_day[bond_index, np.minimum(steps, limit[bond_index])], _days_in_month(month_index))
+
+            self._cash_flow_schedule = {
+                'bond_index': bond_index,
+                'payment_date': _date_from_month_index(month_index, day),
+                'amount': self.base_coupon_payments[bond_index] + np.where(steps == 0, self.base_price, 0),
+            }
+        return self._cash_flow_schedule
+
+    def price_scenarios(self, shocks):
+        """
+        Reprices every bond in the batch under parallel yield shocks in one broadcast pass.
+
+        The coupon schedules, payment counts and period fractions (DSC/E) do not depend on the yield,
+        so they are computed once and shared by every scenario. Each cell matches the price of
+        Bond(face_value, coupon_rate, yield_rate + shock, ...).
+
+        Args:
+            shocks (array-like): The yield shifts added to each bond's yield (decimal, e.g. 0.0001 for 1bp).
+
+        Returns:
+            dict: A dictionary containing the shocks, the base bond values and (bonds x scenarios) matrices of
+            dirty price, clean price (both base 100), bond value and P&L (scenario bond value less base bond value).
+        """
+        shocks = np.atleast_1d(np.asarray(shocks, dtype=np.float64))
+        period_fraction = (self.DSC / self.E)[:, None]
+        coupon_frequency = self.coupon_frequency[:, None]
+        coupon_pmt = self.base_coupon_payments[:, None]
+        no_of_payment = self.no_of_payment[:, None]
+        face_value = self.face_value[:, None]
+        accrued_int = round_array(self.base_coupon_payments * self.A / self.E, 4)[:, None]
+
+        base_price = round_array(_present_value(coupon_pmt, self.base_price, self.yield_rate[:, None] / coupon_frequency,
+                                                no_of_payment, period_fraction), 4)
+        dirty_price = round_array(_present_value(coupon_pmt, self.base_price, (self.yield_rate[:, None] + shocks) / coupon_frequency,
+                                                 no_of_payment, period_fraction), 4)
+        bond_value = dirty_price * face_value / self.base_price
+        base_bond_value = base_price * face_value / self.base_price
+        return {
+            'shocks': shocks,
+            'base_bond_value': base_bond_value[:, 0],
+            'dirty_price': dirty_price,
+            'clean_price': dirty_price - accrued_int,
+            'bond_value': bond_value,
+            'pnl': bond_value - base_bond_value,
+        }
+
+    def yield_from_price(self, clean_price, max_iterations=50, tolerance=1e-10):
+        """
+        Solves the yield implied by a clean price (base 100) for every bond in the batch.
+        The yields the batch was built with are ignored.
+
+        Args:
+            clean_price (array-like): The quoted clean prices (base 100).
+            max_iterations (int, optional): The maximum number of solver iterations. Defaults to 50.
+            tolerance (float, optional): The price tolerance relative to the target price. Defaults to 1e-10.
+
+        Returns:
+            dict: A dictionary containing the annual yields, iterations per bond, convergence flags,
+            total iterations run and elapsed seconds.
+        """
+        period_fraction = self.DSC / self.E
+        accrued_int = round_array(self.base_coupon_payments * self.A / self.E, 4)
+        dirty_price = np.broadcast_to(np.asarray(clean_price, dtype=np.float64), accrued_int.shape) + accrued_int
+        return _solve_yield(dirty_price, self.base_coupon_payments, np.full(dirty_price.shape, float(self.base_price)),
+                            self.coupon_frequency, self.no_of_payment, period_fraction, max_iterations, tolerance)
+
+
+def price_batch(face_value, coupon_rate, yield_rate, coupon_frequency, maturity_date, settlement_date, day_count='ACT/ACT'):
+    """
+    Values a batch of bonds in one vectorized pass.
+
+    Args:
+        face_value (array-like): The face values of the bonds.
+        coupon_rate (array-like): The annual coupon rates (decimal).
+        yield_rate (array-like): The annual yield rates (decimal).
+        coupon_frequency (array-like): The number of coupon payments per year.
+        maturity_date (array-like): The maturity dates.
+        settlement_date (array-like): The settlement dates.
+        day_count (str or array-like, optional): The day count convention, a key of DAY_COUNTS, or one per bond. Defaults to 'ACT/ACT'.
+
+    Returns:
+        dict: A dictionary of arrays with the dirty price, accrued interest, clean price, bond value and risk measures.
+    """
+    return BondBatch(face_value, coupon_rate, yield_rate, coupon_frequency, maturity_date, settlement_date, day_count).price()
+
+
+def price_scenarios(face_value, coupon_rate, yield_rate, coupon_frequency, maturity_date, settlement_date, shocks, day_count='ACT/ACT'):
     """
-    Rounds a floating-point number to a given number of decimal places
-    using a custom rounding logic.
+    Reprices a portfolio under a vector of parallel yield shocks in one broadcast pass.
 
-    Parameters:
-    number (float): The input number to be rounded.
-    decimal_places (int): The number of decimal places to round to.
+    Args:
+        face_value (array-like): The face values of the bonds.
+        coupon_rate (array-like): The annual coupon rates (decimal).
+        yield_rate (array-like): The annual yield rates (decimal).
+        coupon_frequency (array-like): The number of coupon payments per year.
+        maturity_date (array-like): The maturity dates.
+        settlement_date (array-like): The settlement dates.
+        shocks (array-like): The yield shifts (decimal).
+        day_count (str or array-like, optional): The day count convention, a key of DAY_COUNTS, or one per bond. Defaults to 'ACT/ACT'.
 
     Returns:
-    float: The rounded number.
+        dict: A dictionary of (bonds x scenarios) matrices, as returned by BondBatch.price_scenarios.
     """
+    return BondBatch(face_value, coupon_rate, yield_rate, coupon_frequency, maturity_date, settlement_date, day_count).price_scenarios(shocks)
 
-    # Convert the number to string and split into integer and decimal parts
-    integer_part, decimal_part = str(number).split(".")
 
-    # Convert the decimal part into a list of individual digits (as integers)
-    decimal_digits = list(map(int, decimal_part))
+def yield_batch(clean_price, coupon_rate, coupon_frequency, maturity_date, settlement_date, max_iterations=50, tolerance=1e-10,
+                day_count='ACT/ACT'):
+    """
+    Solves the yield to maturity implied by each quoted clean price in one vectorized pass.
 
-    # Determine how many decimal places need to be processed
-    rounding_iterations = len(decimal_digits) - decimal_places
+    Args:
+        clean_price (array-like): The quoted clean prices (base 100).
+        coupon_rate (array-like): The annual coupon rates (decimal).
+        coupon_frequency (array-like): The number of coupon payments per year.
+        maturity_date (array-like): The maturity dates.
+        settlement_date (array-like): The settlement dates.
+        max_iterations (int, optional): The maximum number of solver iterations. Defaults to 50.
+        tolerance (float, optional): The price tolerance relative to the target price. Defaults to 1e-10.
+        day_count (str or array-like, optional): The day count convention, a key of DAY_COUNTS, or one per bond. Defaults to 'ACT/ACT'.
 
-    # Traverse from the rightmost digit to the required decimal place
-    for _ in range(rounding_iterations):
-        # Remove the last digit and check if it's 5 or greater
-        if decimal_digits.pop(-1) >= 5:
-            decimal_digits[-1] += 1  # Round up the next left digit
+    Returns:
+        dict: A dictionary containing the annual yields, iterations per bond, convergence flags,
+        total iterations run and elapsed seconds.
+    """
+    clean_price = np.asarray(clean_price, dtype=np.float64)
+    batch = BondBatch(np.ones(clean_price.shape), coupon_rate, 0.0, coupon_frequency, maturity_date, settlement_date, day_count)
+    return batch.yield_from_price(clean_price, max_iterations, tolerance)
 
-    # Convert the modified decimal part back to a string
-    rounded_decimal_part = "".join(map(str, decimal_digits))
 
-    # Combine the integer and decimal part to form the final number
-    rounded_result = f"{integer_part}.{rounded_decimal_part}"
+class YieldCurve:
+    """
+    A discount curve held as a dense daily grid of discount factors from the curve date.
 
-    return float(rounded_result)
+    Bonds are priced off the grid by looking up the discount factor of each cash flow date (a gather)
+    and summing the discounted cash flows, instead of discounting everything at one flat yield.
+    Between nodes the log discount factors are interpolated linearly (constant forward rates), and
+    beyond the last node the last forward rate is held flat.
+    """
 
+    def __init__(self, curve_date, node_dates, discount_factors, horizon=None):
+        """
+        Args:
+            curve_date (datetime.date): The date the discount factors are measured from (discount factor 1).
+            node_dates (list): The node dates, in ascending order and after the curve date.
+            discount_factors (list): The discount factor at each node date.
+            horizon (int, optional): The number of days covered by the grid. Defaults to 60 years.
+        """
+        self.curve_date = curve_date
+        node_days = np.array([0] + [(date - curve_date).days for date in node_dates])
+        log_discount = np.log(np.array([1.0] + list(discount_factors), dtype=np.float64))
+        if node_days.size < 2 or np.any(np.diff(node_days) <= 0):
+            raise ValueError("A yield curve needs at least one node, with node dates ascending after the curve date")
+        self.horizon = max(horizon or 60 * 366, int(node_days[-1]))
+
+        days = np.arange(self.horizon + 1)
+        last_forward = (log_discount[-1] - log_discount[-2]) / (node_days[-1] - node_days[-2])
+        log_grid = np.interp(days, node_days, log_discount)
+        log_grid = np.where(days > node_days[-1], log_discount[-1] + (days - node_days[-1]) * last_forward, log_grid)
+        self.node_days = node_days
+        self.discount_factors = np.exp(log_grid)  # Discount factor for each day from the curve date
+
+    @classmethod
+    def bootstrap(cls, curve_date, deposits=(), bonds=(), horizon=None):
+        """
+        Builds a curve from money market deposits and coupon bonds, shortest maturity first.
 
-class Bond:
-  def __init__(self, face_value, coupon_rate, yield_rate, coupon_frequency, maturity_date, settlement_date):
-    self.face_value = face_value
-    self.coupon_rate = coupon_rate
-    self.yield_rate = yield_rate
-    self.coupon_frequency = coupon_frequency
-    self.maturity_date = maturity_date
-    self.settlement_date = settlement_date
-    self.base_price = 100
-
-    self.base_coupon_payments = self.__calculate_coupon_payments(self.base_price) #Compute the coupon payment base on the frequancy
-    self.coupon_dates = self.__generate_coupon_dates() # This is dictionary which has settelemnt dates and all coupon dates from most recent coupon dates to maturity dates
-    self.no_of_payment = self.__calculate_no_compounding_periods(self.coupon_dates['coupon_dates'][0], self.coupon_dates['coupon_dates'][-1], self.coupon_frequency) # No of coupon payments
-    self.DSC = abs(self.__no_of_days_between_dates(settlement_date, self.coupon_dates['coupon_dates'][1]))       #No of days from settelement date to next coupon date
-    self.E = abs(self.__no_of_days_between_dates(self.coupon_dates['coupon_dates'][0], self.coupon_dates['coupon_dates'][1]))  # number of days in coupon period in which the settlement date falls.
-    self.dirty_price = self.__calculate_bond_price(self.base_coupon_payments,self.base_price,self.no_of_payment,self.DSC,self.E)
-    self.bond_value = self.__get_bond_value(self.face_value, self.dirty_price) # Total value of the bond
-    self.accrued_int= self.__accrued_int(self.base_coupon_payments,self.DSC,self.E) # Accrued interest base on 100
-    self.clean_price = self.dirty_price - self.accrued_int    # Clean Price
-    self.bond_type = 'Premium Bond' if self.coupon_rate > self.yield_rate else 'Discounted Bond' if self.coupon_rate < self.yield_rate else 'Par Bond'
-    self.compound_frequency = self.__compound_period()  # Get compound frequency
-    self.modified_duration = ""
+        Deposits give their discount factor directly, 1 / (1 + rate * days / 360). Each bond then adds a node at
+        its maturity, solved with Newton's method so the bond's dirty price off the curve matches its quote.
 
+        Args:
+            curve_date (datetime.date): The curve (settlement) date.
+            deposits (iterable, optional): (maturity date, simple ACT/360 rate) pairs.
+            bonds (iterable, optional): (maturity date, coupon rate, coupon frequency, clean price base 100) tuples.
+            horizon (int, optional): The number of days covered by the grid. Defaults to 60 years.
 
-  def __calculate_coupon_payments(self,face_value):
-    """Calculate the coupon payment amount based on the face value, coupon rate, and coupon frequency.
+        Returns:
+            YieldCurve: The bootstrapped curve.
+        """
+        node_dates = []
+        log_discount = [0.0]
+        node_days = [0]
+        for maturity_date, rate in sorted(deposits):
+            node_dates.append(maturity_date)
+            node_days.append((maturity_date - curve_date).days)
+            log_discount.append(-math.log1p(rate * node_days[-1] / 360))
+
+        for maturity_date, coupon_rate, coupon_frequency, clean_price in sorted(bonds):
+            bond = Bond(100, coupon_rate, 0.0, coupon_frequency, maturity_date, curve_date)
+            ordinals, index = bond.coupon_schedule
+            days = np.frombuffer(ordinals, dtype=np.int32)[index + 1:] - curve_date.toordinal()
+            if days[-1] <= node_days[-1]:
+                raise ValueError(f"Bond maturing on {maturity_date} does not extend the curve beyond {node_dates[-1]}")
+            amounts = np.full(days.size, bond.base_coupon_payments)
+            amounts[-1] += bond.base_price
+            dirty_price = clean_price + bond.accrued_int
+
+            # Weight of the new node in each cash flow's interpolated log discount factor
+            weight = np.clip((days - node_days[-1]) / (days[-1] - node_days[-1]), 0, 1)
+            guess = log_discount[-1] * days[-1] / node_days[-1] if node_days[-1] else -0.05 * days[-1] / 365
+            for _ in range(50):
+                discounted = amounts * np.exp(np.interp(days, node_days + [days[-1]], log_discount + [guess]))
+                step = (discounted.sum() - dirty_price) / (discounted * weight).sum()
+                guess -= step
+                if abs(step) < 1e-14:
+                    break
+            else:
+                raise ValueError(f"Curve bootstrap did not converge for the bond maturing on {maturity_date}")
+            node_dates.append(maturity_date)
+            node_days.append(int(days[-1]))
+            log_discount.append(guess)
+
+        return cls(curve_date, node_dates, np.exp(log_discount[1:]), horizon)
+
+    def __day_offsets(self, dates):
+        """
+        Converts dates to grid positions (days from the curve date), checking they are on the grid.
+
+        Args:
+            dates (numpy.ndarray): The datetime64[D] dates.
+
+        Returns:
+            numpy.ndarray: The day offsets.
+        """
+        days = (dates - np.datetime64(self.curve_date, 'D')).astype(np.int64)
+        if days.size and (days.min() < 0 or days.max() > self.horizon):
+            raise ValueError(f"Dates must fall between the curve date {self.curve_date} and the curve horizon of {self.horizon} days")
+        return days
+
+    def discount_factor(self, dates):
+        """
+        Looks up the discount factors of dates from the grid.
+
+        Args:
+            dates (array-like): The dates.
+
+        Returns:
+            numpy.ndarray: The discount factors from the curve date.
+        """
+        return self.discount_factors[self.__day_offsets(_to_datetime64(dates))]
+
+    def price(self, bond):
+        """
+        Values a bond off the curve, keeping its schedule and day count.
+
+        Args:
+            bond (Bond): The bond. Its yield rate is ignored.
+
+        Returns:
+            dict: A dictionary containing the dirty price, accrued interest, clean price (all base 100) and bond value.
+        """
+        ordinals, index = bond.coupon_schedule
+        days = self.__day_offsets((np.frombuffer(ordinals, dtype=np.int32)[index + 1:] - _EPOCH_ORDINAL).astype('datetime64[D]'))
+        settlement = self.__day_offsets(np.datetime64(bond.settlement_date, 'D'))
+        discount_factors = self.discount_factors[days]
+        present_value = (bond.base_coupon_payments * discount_factors.sum() + bond.base_price * discount_factors[-1]) / self.discount_factors[settlement]
+        dirty_price = round_number(float(present_value), 4)
+        return {
+            'dirty_price': dirty_price,
+            'accrued_int': bond.accrued_int,
+            'clean_price': dirty_price - bond.accrued_int,
+            'bond_value': dirty_price * bond.face_value / bond.base_price,
+        }
+
+    def price_batch(self, batch):
+        """
+        Values every bond of a BondBatch off the curve: one gather of discount factors for all cash flows,
+        then one weighted sum per bond. The batch's cash flow layout is reused across curves.
+
+        Args:
+            batch (BondBatch): The bonds. Their yield rates are ignored.
+
+        Returns:
+            dict: A dictionary of arrays with the dirty price, accrued interest, clean price (all base 100) and bond value.
+        """
+        schedule = batch.cash_flow_schedule()
+        discounted = schedule['amount'] * self.discount_factors[self.__day_offsets(schedule['payment_date'])]
+        present_value = np.bincount(schedule['bond_index'], weights=discounted, minlength=len(batch))
+        present_value /= self.discount_factors[self.__day_offsets(batch.settlement_date)]
+        dirty_price = round_array(present_value, 4)
+        accrued_int = round_array(batch.base_coupon_payments * batch.A / batch.E, 4)
+        return {
+            'dirty_price': dirty_price,
+            'accrued_int': accrued_int,
+            'clean_price': dirty_price - accrued_int,
+            'bond_value': dirty_price * batch.face_value / batch.base_price,
+        }
+
+
+def _chunk_inputs(inputs, chunk_size):
+    """
+    Splits broadcast Bond input arrays into consecutive chunks of at most chunk_size bonds.
 
     Args:
-        face_value (float): The face value of the bond.
+        inputs (tuple): The face value, coupon rate, yield rate, coupon frequency, maturity date and settlement date arrays,
+            and the day count convention (one name, or one per bond).
+        chunk_size (int): The maximum number of bonds per chunk.
 
     Returns:
-        float: The coupon payment amount.
+        list: A list of input array tuples, in order.
+
+    Raises:
+        ValueError: When chunk_size is less than 1.
     """
-    coupon_pmt = face_value * self.coupon_rate / self.coupon_frequency
-    return coupon_pmt
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    day_count = inputs[6]
+    arrays = list(np.broadcast_arrays(
+        np.atleast_1d(np.asarray(inputs[0], dtype=np.float64)),
+        np.asarray(inputs[1], dtype=np.float64),
+        np.asarray(inputs[2], dtype=np.float64),
+        np.asarray(inputs[3], dtype=np.int64),
+        _to_datetime64(inputs[4]),
+        _to_datetime64(inputs[5]),
+        *([] if np.ndim(day_count) == 0 else [np.asarray(day_count)]),
+    ))
+    if np.ndim(day_count) == 0:
+        arrays.append(day_count)
+    size = arrays[0].size
+    return [tuple(np.ascontiguousarray(array[start:start + chunk_size]) if isinstance(array, np.ndarray) else array for array in arrays)
+            for start in range(0, size, chunk_size)]
+
+
+def _price_chunk(chunk):
+    """
+    Process pool worker: values one chunk of bonds with BondBatch.
 
-  def __compound_period(self):
-    """Calculate the compound period based on the coupon frequency.
+    Args:
+        chunk (tuple): Bond input arrays.
 
     Returns:
-        str: The compound period (e.g., "Monthly", "Quarterly", "Semi-Annual", "Annual").
+        dict: A dictionary of result arrays.
     """
-    compound_period = "Monthly" if self.coupon_frequency == 12 else "Quarterly" if self.coupon_frequency == 4 else "Semi-Annual" if self.coupon_frequency == 2 else "Annual"
-    return compound_period
+    return BondBatch(*chunk).price()
 
 
-  def __calculate_bond_price(self,coupon_pmt,redemption,no_of_payment,DSC,E):
-    """Calculate the present value of the bond cash flows.
+def _amortize_chunk(chunk):
+    """
+    Process pool worker: builds the amortization table of every bond in one chunk.
 
     Args:
-        coupon_pmt (float): The coupon payment amount.
+        chunk (tuple): Bond input arrays.
 
     Returns:
-        dict: A dictionary containing the present value of the redemption and coupon payments.
+        list: One amortization table per bond.
     """
+    face_value, coupon_rate, yield_rate, coupon_frequency, maturity_date, settlement_date, day_count = chunk
+    day_count = day_count.tolist() if isinstance(day_count, np.ndarray) else [day_count] * face_value.size
+    return [Bond(*inputs).get_bond_amortization_table()
+            for inputs in zip(face_value.tolist(), coupon_rate.tolist(), yield_rate.tolist(), coupon_frequency.tolist(),
+                              maturity_date.astype(object), settlement_date.astype(object), day_count)]
 
-    pv_redemption = redemption / ((1 + (self.yield_rate/self.coupon_frequency)) ** (no_of_payment-1+(DSC/E)))
 
-    pv_coupon = 0
-    for n in range(1, no_of_payment+1):
-      pv_coupon += coupon_pmt / ((1 + (self.yield_rate/self.coupon_frequency)) ** (n-1+(DSC/E)))
+def _map_chunks(worker, chunks, workers):
+    """
+    Runs a worker over the chunks, in a process pool when more than one worker is requested.
+
+    Args:
+        worker (function): The module-level worker function.
+        chunks (list): The input chunks.
+        workers (int): The number of processes (None for one per CPU).
 
-    result = round_number((pv_redemption + pv_coupon),4)
-    return result
+    Returns:
+        list: The worker results in chunk order.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) <= 1:
+        return [worker(chunk) for chunk in chunks]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        return list(executor.map(worker, chunks))
 
 
-  def __accrued_int(self,coupon_pmt,DSC,E):
-    """Calculate the accrued interest on the bond.
+def price_parallel(face_value, coupon_rate, yield_rate, coupon_frequency, maturity_date, settlement_date,
+                   workers=None, chunk_size=50000, day_count='ACT/ACT'):
+    """
+    Values a batch of bonds across a process pool.
+
+    The inputs are split into chunks of compact NumPy arrays, each chunk is priced by BondBatch in a
+    worker process, and the results are joined back in input order.
 
     Args:
-        coupon_pmt (float): The coupon payment amount.
-        DSC (int): The number of days since the last coupon payment.
-        E (int): The number of days in the coupon period.
+        face_value (array-like): The face values of the bonds.
+        coupon_rate (array-like): The annual coupon rates (decimal).
+        yield_rate (array-like): The annual yield rates (decimal).
+        coupon_frequency (array-like): The number of coupon payments per year.
+        maturity_date (array-like): The maturity dates.
+        settlement_date (array-like): The settlement dates.
+        workers (int, optional): The number of worker processes. Defaults to one per CPU.
+        chunk_size (int, optional): The number of bonds per chunk. Defaults to 50000.
+        day_count (str or array-like, optional): The day count convention, a key of DAY_COUNTS, or one per bond. Defaults to 'ACT/ACT'.
 
     Returns:
-        float: The accrued interest amount.
+        dict: A dictionary of arrays with the same fields as BondBatch.price().
     """
-    return round_number((coupon_pmt * (E-DSC) / E),4)
+    chunks = _chunk_inputs((face_value, coupon_rate, yield_rate, coupon_frequency, maturity_date, settlement_date, day_count), chunk_size)
+    if not chunks:
+        return price_batch(face_value, coupon_rate, yield_rate, coupon_frequency, maturity_date, settlement_date, day_count)
+    results = _map_chunks(_price_chunk, chunks, workers)
+    return {field: np.concatenate([result[field] for result in results]) for field in results[0]}
 
 
-  def __add_months(self,sourcedate, months):
+def amortization_tables_parallel(face_value, coupon_rate, yield_rate, coupon_frequency, maturity_date, settlement_date,
+                                 workers=None, chunk_size=1000, day_count='ACT/ACT'):
     """
-    Adds (or subtracts) months to a given date.
+    Builds the amortization table of every bond across a process pool.
+
     Args:
-        sourcedate (datetime.date): The source date.
-        months (int): The number of months to add or subtract.
+        face_value (array-like): The face values of the bonds.
+        coupon_rate (array-like): The annual coupon rates (decimal).
+        yield_rate (array-like): The annual yield rates (decimal).
+        coupon_frequency (array-like): The number of coupon payments per year.
+        maturity_date (array-like): The maturity dates.
+        settlement_date (array-like): The settlement dates.
+        workers (int, optional): The number of worker processes. Defaults to one per CPU.
+        chunk_size (int, optional): The number of bonds per chunk. Defaults to 1000.
+        day_count (str or array-like, optional): The day count convention, a key of DAY_COUNTS, or one per bond. Defaults to 'ACT/ACT'.
 
     Returns:
-        datetime.date: The resulting date after adding or subtracting months.
+        list: One amortization table (as returned by Bond.get_bond_amortization_table) per bond, in input order.
     """
-    month = sourcedate.month - 1 + months
-    year = sourcedate.year + month // 12
-    month = month % 12 + 1
-    day = min(sourcedate.day, calendar.monthrange(year, month)[1])
-    return datetime.date(year, month, day)
+    chunks = _chunk_inputs((face_value, coupon_rate, yield_rate, coupon_frequency, maturity_date, settlement_date, day_count), chunk_size)
+    return [table for tables in _map_chunks(_amortize_chunk, chunks, workers) for table in tables]
 
 
-  def __generate_coupon_dates(self):
+def _export_format(path, file_format):
     """
-    Generates a list of coupon payment dates (as datetime.date objects) from settlement until maturity.
-    Assumes coupons are paid at regular intervals.
+    Returns the amortization export format, taken from the file extension when not given.
 
     Args:
-        maturity_date (datetime.date): The maturity date of the bond.
-        settlement_date (datetime.date): The settlement date of the bond.
-        coupon_frequency (int): The number of coupon payments per year.
+        path (str): The output file path.
+        file_format (str): 'parquet', 'arrow', 'npy' or None.
 
     Returns:
-        dict: A dictionary containing the settlement date and a list of coupon payment dates.
+        str: 'parquet', 'arrow' or 'npy'.
     """
-    result_coupon_dates = {'settlement_date': self.settlement_date,'coupon_dates':[self.maturity_date]}
-    current_date = self.maturity_date
-    #coupon_dates.append(current_date)
-
-    months_interval = 12 // self.coupon_frequency
-    # Generate coupon dates backwards from maturity until before the settlement date
-    while True:
-        current_date = self.__add_months(current_date,-months_interval)
-        result_coupon_dates['coupon_dates'].append(current_date)
-        if current_date <= self.settlement_date:
-            break
-    result_coupon_dates['coupon_dates'].sort()
-    return result_coupon_dates
+    if file_format:
+        return file_format
+    extension = os.path.splitext(path)[1].lower()
+    formats = {'.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow', '.npy': 'npy'}
+    if extension not in formats:
+        raise ValueError(f"Cannot tell the export format of {path}, use .parquet, .arrow or .npy")
+    return formats[extension]
 
 
-  def __calculate_no_compounding_periods(self, start_date, end_date, compounding_frequency):
-    """Calculates the number of compounding periods between two dates.
+def _amortization_rows(bond):
+    """
+    Returns the number of rows of a bond's amortization table without building it: one per remaining
+    coupon period, plus the settlement row when settlement falls between coupon dates.
 
     Args:
-        start_date (datetime.date): The start date.
-        end_date (datetime.date): The end date.
-        compounding_frequency (int): The number of times compounding occurs per year.
+        bond (Bond): The bond.
 
     Returns:
-        int: The number of compounding periods.
+        int: The number of rows.
     """
-    total_months = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month)
-    compounding_periods = int(math.ceil(total_months / (12 / compounding_frequency))) # calculate the no periods between two dates and round up the result
-    return compounding_periods
+    ordinals, index = bond.coupon_schedule
+    return len(ordinals) - index - 1 + (ordinals[index] != bond.settlement_date.toordinal())
+
 
+def export_amortization_tables(bonds, path, file_format=None, batch_rows=65536):
+    """
+    Writes the amortization tables of many bonds into one columnar file, with a bond_no column
+    giving each row's position in bonds. Tables are written one bond at a time, so memory does not
+    grow with the number of bonds.
 
-  def __no_of_days_between_dates(self,start_date, end_date):
-    """Calculates the number of days between two dates.
+    - 'npy': a NumPy structured array written through a memory map. The row count is taken from the
+      bonds' schedules first, then each table is built straight into its slice of the map. Downstream
+      jobs read it without copying with numpy.load(path, mmap_mode='r').
+    - 'parquet' and 'arrow' (Arrow IPC / Feather): written with pyarrow, which is optional, in record
+      batches of batch_rows rows.
 
     Args:
-        start_date (datetime.date): The start date.
-        end_date (datetime.date): The end date.
+        bonds (iterable): The Bond objects.
+        path (str): The output file path.
+        file_format (str, optional): 'parquet', 'arrow' or 'npy'. Defaults to the file extension.
+        batch_rows (int, optional): The rows per Parquet row group / Arrow record batch. Defaults to 65536.
 
     Returns:
-        int: The number of days between the two dates.
+        int: The number of rows written.
     """
-    return (end_date - start_date).days
+    file_format = _export_format(path, file_format)
+    if file_format not in ('parquet', 'arrow', 'npy'):
+        raise ValueError(f"Unknown export format: {file_format}")
+    dtype = np.dtype([('bond_no', np.int64)] + AMORTIZATION_DTYPE.descr)
+
+    if file_format == 'npy':
+        bonds = list(bonds)
+        columns = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(sum(_amortization_rows(bond) for bond in bonds),))
+        start = 0
+        for bond_no, bond in enumerate(bonds):
+            table = bond.get_amortization_array()
+            bonds[bond_no] = None  # Release each bond (and its cached schedule) once its table is written
+            rows = columns[start:start + table.size]
+            rows['bond_no'] = bond_no
+            for name in AMORTIZATION_DTYPE.names:
+                rows[name] = table[name]
+            start += table.size
+        columns.flush()
+        del columns
+        return start
+
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(f"Exporting to {file_format} requires pyarrow (pip install pyarrow)") from None
+    buffer = np.empty(batch_rows, dtype=dtype)
+    schema = pyarrow.table({name: buffer[name][:0] for name in dtype.names}).schema
+    if file_format == 'parquet':
+        writer = pyarrow.parquet.ParquetWriter(path, schema)
+    else:
+        writer = pyarrow.ipc.new_file(path, schema)
+
+    def flush(filled):
+        writer.write_table(pyarrow.table({name: buffer[name][:filled] for name in dtype.names}, schema=schema))
+
+    size = 0
+    filled = 0
+    with writer:
+        for bond_no, bond in enumerate(bonds):
+            table = bond.get_amortization_array()
+            if filled + table.size > buffer.size:
+                flush(filled)
+                filled = 0
+                if table.size > buffer.size:
+                    buffer = np.empty(table.size, dtype=dtype)
+            rows = buffer[filled:filled + table.size]
+            rows['bond_no'] = bond_no
+            for name in AMORTIZATION_DTYPE.names:
+                rows[name] = table[name]
+            filled += table.size
+            size += table.size
+        if filled or not size:
+            flush(filled)
+    return size
 
 
-  def __get_bond_value(self,face_value, dirty_price):
+# ========================================================================================================================================================================================================================================================================
+REPORT_VERSION = 1 # Bump when the report layout changes, so cached workbooks are rebuilt
+
+
+def report_key(*report_inputs):
     """
-    Get the bond value based on the dirty price.
+    Returns the content hash naming a report: the SHA-256 of the report inputs and REPORT_VERSION.
 
     Args:
-        dirty_price (float): The dirty price of the bond.
+        *report_inputs: The values written to the report (numbers, dates, strings and tables of them).
 
     Returns:
-        float: The bond value.
+        str: The hexadecimal digest.
     """
-    return dirty_price * face_value / self.base_price
+    return hashlib.sha256(repr((REPORT_VERSION,) + report_inputs).encode()).hexdigest()
 
 
-  def get_bond_amortization_table(self):
+class ReportCache:
     """
-    Calculate the amortization table for the bond.
-
-    Returns:
-        list: A list of lists containing the amortization table data.
-        Each inner list represents a row in the table and contains the following elements:
-        - Coupon Number
-        - Beginning Date
-        - Open Bond Value
-        - Interest Payment
-        - Coupon Payment
-        - End Bond Value
-        - End Date
+    On-disk index of generated reports, keyed by report_key.
+
+    The index is a JSON file in the report directory recording each report's file, size, creation and
+    last use time. A report whose key is indexed and whose file is still on disk with the recorded size
+    is not generated again, so a rerun only rebuilds the reports whose inputs changed. The index is
+    rewritten atomically after every change, so a run that fails part way keeps the reports it finished.
+    Entries older than max_age seconds are evicted, then the least recently used ones until the cache
+    holds at most max_entries reports and max_bytes bytes. Evicted report files are deleted.
+
+    A cache hit updates the report's last use time and saves the index straight away. Used as a context
+    manager (with ReportCache(directory) as cache: ...), hits are saved once when the block exits instead,
+    so a rerun where every report hits doesn't rewrite the index for each one.
     """
-    coupon_dates = self.coupon_dates['coupon_dates']                            # All coupon dates until maturiry
-    settlement_date = self.coupon_dates['settlement_date']                      # Settlement date
-    redemption = self.base_price                                                # Base redemption price which is 100
-    base_coupon_payment = self.base_coupon_payments                             # Coupon payment base on face value 100
-    face_value = self.face_value                                                # Actual Face value
-    coupon_payment = self.__calculate_coupon_payments(face_value)               # Actual coupon payment base on actual face value
 
-    # create initial amortization shedule with date and bond value
-    amortization_table = []
-    no_of_payment= len(coupon_dates)
-    for n in range(no_of_payment, 0,-1):
-      dirty_price = self.__calculate_bond_price(base_coupon_payment,redemption,n-1,1,1)
-      bond_value = self.__get_bond_value(face_value, dirty_price)
-      date=coupon_dates.pop(0)
-      coupon_no = no_of_payment-n
-      amortization_table.append([coupon_no, date, bond_value])
+    INDEX_FILE = ".report_cache.json"
+
+    def __init__(self, directory=".", max_entries=None, max_bytes=None, max_age=None):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.__defer_saves = False  # Inside a with block: hits are saved on exit
+        self.__unsaved = False
+        os.makedirs(directory, exist_ok=True)
+        self.__index_path = os.path.join(directory, self.INDEX_FILE)
+        try:
+            with open(self.__index_path) as stream:
+                self.__entries = json.load(stream)
+        except (OSError, ValueError):
+            self.__entries = {}
+
+    def get(self, key):
+        """
+        Returns the path of a cached report, or None when it has to be generated.
 
-    # append each row of amortization shedule with interest payament, coupon payment, end bond value and end date
-    no_of_periods = len(amortization_table)
-    for index, row in enumerate(amortization_table[:-1]):
-      next_bond_value = amortization_table[index+1][2]
-      current_bond_value = row[2]
-      interest = next_bond_value - current_bond_value + coupon_payment
-      next_coupon_date = amortization_table[index+1][1]
-      amortization_table[index].append(interest)
-      amortization_table[index].append(coupon_payment)
-      amortization_table[index].append(next_bond_value)
-      amortization_table[index].append(next_coupon_date)
+        Args:
+            key (str): The report key.
 
-    # Delete the last item in the amortization shedule which is the face value. This is added to the end value of the previoust row
-    del amortization_table[-1]
+        Returns:
+            str: The report path, or None.
+        """
+        entry = self.__entries.get(key)
+        if entry is not None:
+            path = os.path.join(self.directory, entry['file'])
+            try:
+                if os.path.getsize(path) == entry['size']:
+                    self.hits += 1
+                    entry['last_used'] = time.time()
+                    if self.__defer_saves:
+                        self.__unsaved = True
+                    else:
+                        self.__save()
+                    return path
+            except OSError:
+                pass
+            del self.__entries[key]
+            self.__save()
+        self.misses += 1
+        return None
+
+    def path(self, file_name):
+        """
+        Returns where a report file is written.
 
-    if settlement_date != amortization_table[0][1]:
-      coupon_no = round_number(self.DSC/self.E,2)
+        Args:
+            file_name (str): The report file name.
 
-      # Change the interest, coupon,end value and end date of first coupon to adjest the settelement date
-      intrest_to_settle_date = self.bond_value - amortization_table[0][2]
-      amortization_table[0][3] = intrest_to_settle_date
-      amortization_table[0][4] = 0
-      amortization_table[0][5] = self.bond_value
-      amortization_table[0][6] = settlement_date
+        Returns:
+            str: The path in the cache directory.
+        """
+        return os.path.join(self.directory, file_name)
 
-      # Add new entry to settlement date values
-      intrest_to_next_coupon_date = amortization_table[1][2] - self.bond_value  + coupon_payment
-      end_bond_value = amortization_table[1][2]
-      next_coupon_date = amortization_table[1][1]
-      amortization_table.insert(1,[coupon_no,settlement_date,self.bond_value,intrest_to_next_coupon_date,coupon_payment,end_bond_value,next_coupon_date])
+    def put(self, key, path):
+        """
+        Records a generated report, then evicts old and excess reports.
 
-    return amortization_table
+        Args:
+            key (str): The report key.
+            path (str): The report path, in the cache directory.
+        """
+        now = time.time()
+        self.__entries[key] = {'file': os.path.basename(path), 'size': os.path.getsize(path), 'created': now, 'last_used': now}
+        self.evict(keep=key)
+
+    def evict(self, keep=None):
+        """
+        Removes expired reports, then the least recently used ones over the entry and size limits, and saves the index.
+
+        Args:
+            keep (str, optional): The key of a report that is never evicted (the one just generated).
+        """
+        now = time.time()
+        total_bytes = sum(entry['size'] for entry in self.__entries.values())
+        remaining = len(self.__entries)
+        entries = sorted(self.__entries.items(), key=lambda item: item[1]['last_used'])
+        for key, entry in entries:
+            if key == keep:
+                continue
+            expired = self.max_age is not None and now - entry['created'] > self.max_age
+            too_many = self.max_entries is not None and remaining > self.max_entries
+            too_big = self.max_bytes is not None and total_bytes > self.max_bytes
+            if not (expired or too_many or too_big):
+                continue
+            del self.__entries[key]
+            total_bytes -= entry['size']
+            remaining -= 1
+            try:
+                os.remove(os.path.join(self.directory, entry['file']))
+            except OSError:
+                pass
+        self.__save()
+
+    def clear(self):
+        """Deletes every cached report and empties the index."""
+        for entry in self.__entries.values():
+            try:
+                os.remove(os.path.join(self.directory, entry['file']))
+            except OSError:
+                pass
+        self.__entries.clear()
+        self.__save()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """
+        Returns the cache statistics.
+
+        Returns:
+            dict: A dictionary containing the hits, misses, number of reports and their total size in bytes.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.__entries),
+                'bytes': sum(entry['size'] for entry in self.__entries.values())}
+
+    def close(self):
+        """Saves the last use times of hits not saved yet."""
+        if self.__unsaved:
+            self.__save()
+
+    def __enter__(self):
+        self.__defer_saves = True
+        return self
+
+    def __exit__(self, *exc_info):
+        self.__defer_saves = False
+        self.close()
+        return False
+
+    def __save(self):
+        """Writes the index to a temporary file and moves it over the old one."""
+        temporary_path = f"{self.__index_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as stream:
+            json.dump(self.__entries, stream)
+        os.replace(temporary_path, self.__index_path)
+        self.__unsaved = False
 
 
 # ========================================================================================================================================================================================================================================================================
 class ExcelReport:
 
+    # Cell formats shared by every report, created once per workbook
+    FORMATS = {
+        'header_format': {'bold': True,'font_size':20, 'font_color': 'white', 'bg_color': '#76933c','align': 'center'},
+        'report_topic_format': {'bold': True,'font_size':11, 'font_color': 'white', 'bg_color': '#769042','align': 'center'},
+        'report_topic_format_2': {'bold': True,'font_size':11, 'font_color': 'white', 'bg_color': '#769042','align': 'left'},
+        'report_descriptions_format': {'bold': True,'font_size':11, 'font_color': 'black', 'bg_color': '#d8e4bc'},
+        'amortization_table_topic_format': {'bold': True,'font_size':11, 'font_color': 'white', 'bg_color': '#556B26','align': 'center'},
+        'date_format': {'num_format': 'yyyy-mm-dd'},
+        'currency_format': {'num_format': '#,##0.00_);(#,##0.00)'},
+        'right_align': {'align': 'right'},
+        'settlement_price_format': {'bold': True,'font_color': 'red'},
+        'date_format_red': {'bold': True,'num_format': 'yyyy-mm-dd','font_color': 'red'},
+        'currency_format_red': {'bold': True,'num_format': '#,##0.00_);(#,##0.00)','font_color': 'red'},
+        'ratio_format': {'num_format': '0.00%'},
+        'duration_format': {'num_format': '0.0000'},
+        'price_format': {'num_format': '0.0000'},
+    }
+
+    # Columns of the batch report summary sheet: (header, width, format name)
+    SUMMARY_COLUMNS = (
+        ("No", 8, None), ("Face Value", 16, 'currency_format'), ("Settlement Date", 14, 'date_format'),
+        ("Maturity Date", 14, 'date_format'), ("Coupon Rate", 12, 'ratio_format'), ("Yield Rate", 12, 'ratio_format'),
+        ("Coupon Frequency", 16, None), ("Dirty Price", 12, 'price_format'), ("Clean Price", 12, 'price_format'),
+        ("Accrued Interest", 14, 'price_format'), ("Bond Value", 16, 'currency_format'),
+        ("Modified Duration", 16, 'duration_format'), ("Bond Type", 16, None), ("Amortization Table", 18, None),
+    )
+
+    # Columns of the batch report amortization sheet: (header, format name)
+    AMORTIZATION_COLUMNS = (
+        ("No", None), ("Beginning Date", 'date_format'), ("Open Bond Value", 'currency_format'),
+        ("Interest Payment", 'currency_format'), ("Coupon Payment", 'currency_format'),
+        ("Closing Bond Value", 'currency_format'), ("End Date", 'date_format'),
+    )
+
+    def _add_formats(self, workbook):
+        """
+        Adds the report cell formats to a workbook.
+
+        Args:
+            workbook (xlsxwriter.Workbook): The workbook.
+
+        Returns:
+            dict: The xlsxwriter formats by name.
+        """
+        return {name: workbook.add_format(properties) for name, properties in self.FORMATS.items()}
+
+    @_instrumented('excel_report')
+    def generate_batch_report(self, bonds, file_name=None, include_amortization=True):
+        """
+        Writes many bonds into one workbook:
+        - A "Summary" sheet with one row per bond (prices, dates, rates, modified duration and bond type).
+        - An "Amortization" sheet with one block per bond, linked from the summary row.
+
+        The workbook is opened in xlsxwriter's constant-memory mode and every row is written in one call
+        with formats created once, so peak memory stays flat however many bonds are written.
+        Bonds are consumed one at a time, so a generator of Bond objects is never held in memory.
+
+        Args:
+            bonds (iterable): The Bond objects to report.
+            file_name (str, optional): The workbook file name. Defaults to Bond_Batch_Report_RandomNumber.xlsx.
+            include_amortization (bool, optional): Whether to write the amortization blocks. Defaults to True.
+
+        Returns:
+            str: The workbook file name.
+        """
+        import xlsxwriter  # Imported on first report, so pricing-only users never load it
+
+        file_name = file_name or f"Bond_Batch_Report_{random.randint(1000,9999)}.xlsx"
+        workbook = xlsxwriter.Workbook(file_name, {'constant_memory': True, 'default_date_format': 'yyyy-mm-dd'})
+        formats = self._add_formats(workbook)
+        summary = workbook.add_worksheet("Summary")
+        amortization = workbook.add_worksheet("Amortization") if include_amortization else None
+
+        for col, (header, width, format_name) in enumerate(self.SUMMARY_COLUMNS):
+            summary.set_column(col, col, width, formats.get(format_name))
+        summary.write_row(0, 0, [header for header, _, _ in self.SUMMARY_COLUMNS], formats['report_topic_format'])
+        summary.freeze_panes(1, 0)
+
+        if amortization is not None:
+            amortization.set_column(0, 0, 10)
+            for col, (_, format_name) in enumerate(self.AMORTIZATION_COLUMNS[1:], 1):
+                amortization.set_column(col, col, 18, formats.get(format_name))
+        amortization_headers = [header for header, _ in self.AMORTIZATION_COLUMNS]
+
+        amortization_row = 0
+        summary_row = 0
+        for bond_no, bond in enumerate(bonds, 1):
+            summary_row += 1
+            summary.write_row(summary_row, 0, [
+                bond_no, bond.face_value, bond.settlement_date, bond.maturity_date, bond.coupon_rate, bond.yield_rate,
+                bond.coupon_frequency, bond.dirty_price, bond.clean_price, bond.accrued_int, bond.bond_value,
+                bond.modified_duration, bond.bond_type,
+            ])
+            if amortization is None:
+                continue
+
+            summary.write_url(summary_row, 13, f"internal:'Amortization'!A{amortization_row + 1}", string=f"Row {amortization_row + 1}")
+            amortization.write_row(amortization_row, 0, [
+                f"Bond {bond_no}: {bond.face_value:,.2f} {bond.coupon_rate:.2%} maturing {bond.maturity_date}"
+            ], formats['amortization_table_topic_format'])
+            amortization.write_row(amortization_row + 1, 0, amortization_headers, formats['report_topic_format'])
+            amortization_row += 2
+
+            amortization_table = bond.get_bond_amortization_table()
+            for row in amortization_table:
+                values = [row[0], row[1], row[2], row[3], -row[4], row[5], row[6]]
+                if row[1] == bond.settlement_date:
+                    amortization.write_number(amortization_row, 0, row[0], formats['currency_format_red'])
+                    amortization.write_datetime(amortization_row, 1, row[1], formats['date_format_red'])
+                    amortization.write_row(amortization_row, 2, values[2:6], formats['currency_format_red'])
+                    amortization.write_datetime(amortization_row, 6, row[6], formats['date_format_red'])
+                else:
+                    amortization.write_row(amortization_row, 0, values)
+                amortization_row += 1
+            amortization.write_row(amortization_row, 0, [amortization_table[-1][0] + 1, amortization_table[-1][-1], amortization_table[-1][-2]])
+            amortization_row += 2
+
+        with INSTRUMENTATION.stage('excel_save'):
+            workbook.close()
+        print(f"Excel report generated and saved as {file_name}")
+        return file_name
+
+
+    @_instrumented('excel_report')
     def generate_excel_report(
                                 self,face_value, bond_value, dirty_price, clean_price,
                                 accrued_int, yield_rate, coupon_rate, coupn_freq,
                                 settlement_date, previous_coupon_date, next_coupon_date, maturity_date,
-                                bond_type, no_of_coupon=0, modified_duration=0, amortization_table=None
+                                bond_type, no_of_coupon=0, modified_duration=0, amortization_table=None, cache=None
                                 ):
         """
         Creates an Excel report containing:
@@ -291,7 +2291,9 @@ class ExcelReport:
         - A line chart of bond value progression over the coupon dates.
 
         The Excel file is saved automatically using the naming convention:
-        BondFaceValue_MaturityDate_RandomNumber.xlsx
+        BondFaceValue_MaturityDate_ReportKey.xlsx
+        where ReportKey is the first 16 hex digits of report_key over the arguments, so the same inputs always
+        give the same file name. With a ReportCache, an unchanged report already on disk is not written again.
         Args:
             face_value (float): The face value of the bond.
             bond_value (float): The bond value.
@@ -309,8 +2311,24 @@ class ExcelReport:
             no_of_coupon (int, optional): The number of coupons of the bond. Defaults to 0.
             modified_duration (float, optional): The modified duration of the bond. Defaults to 0.
             amortization_table (list, optional): The amortization table of the bond.
+            cache (ReportCache, optional): The cache of generated reports. The report is written in its directory.
+
+        Returns:
+            str: The report file path.
         """
-        file_name = f"{face_value}_{maturity_date.strftime('%Y%m%d')}_{random.randint(1000,9999)}.xlsx"
+        key = report_key(face_value, bond_value, dirty_price, clean_price, accrued_int, yield_rate, coupon_rate, coupn_freq,
+                         settlement_date, previous_coupon_date, next_coupon_date, maturity_date, bond_type, no_of_coupon,
+                         modified_duration, amortization_table)
+        file_name = f"{face_value}_{maturity_date.strftime('%Y%m%d')}_{key[:16]}.xlsx"
+        if cache is not None:
+            cached_file_name = cache.get(key)
+            if cached_file_name is not None:
+                print(f"Excel report unchanged, kept {cached_file_name}")
+                return cached_file_name
+            file_name = cache.path(file_name)
+
+        import xlsxwriter  # Imported on first report, so pricing-only users never load it
+
         workbook = xlsxwriter.Workbook(file_name)
         worksheet = workbook.add_worksheet("Bond Report")
 
@@ -322,18 +2340,19 @@ class ExcelReport:
         worksheet.hide_gridlines(2)
 
         # Define formatting for headers, dates, and numbers
-        header_format = workbook.add_format({'bold': True,'font_size':20, 'font_color': 'white', 'bg_color': '#76933c','align': 'center'})
-        report_topic_format = workbook.add_format({'bold': True,'font_size':11, 'font_color': 'white', 'bg_color': '#769042','align': 'center'})
-        report_topic_format_2 = workbook.add_format({'bold': True,'font_size':11, 'font_color': 'white', 'bg_color': '#769042','align': 'left'})
-        report_descriptions_format = workbook.add_format({'bold': True,'font_size':11, 'font_color': 'black', 'bg_color': '#d8e4bc'})
-        amortization_table_topic_format = workbook.add_format({'bold': True,'font_size':11, 'font_color': 'white', 'bg_color': '#556B26','align': 'center'})
-        date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
-        currency_format = workbook.add_format({'num_format': '#,##0.00_);(#,##0.00)'})
-        right_align = workbook.add_format({'align': 'right'})
-        settlement_price_format = workbook.add_format({'bold': True,'font_color': 'red'})
-        date_format_red = workbook.add_format({'bold': True,'num_format': 'yyyy-mm-dd','font_color': 'red'})
-        currency_format_red = workbook.add_format({'bold': True,'num_format': '#,##0.00_);(#,##0.00)','font_color': 'red'})
-        ratio_format = workbook.add_format({'num_format': '0.00%'})
+        formats = self._add_formats(workbook)
+        header_format = formats['header_format']
+        report_topic_format = formats['report_topic_format']
+        report_topic_format_2 = formats['report_topic_format_2']
+        report_descriptions_format = formats['report_descriptions_format']
+        amortization_table_topic_format = formats['amortization_table_topic_format']
+        date_format = formats['date_format']
+        currency_format = formats['currency_format']
+        right_align = formats['right_align']
+        date_format_red = formats['date_format_red']
+        currency_format_red = formats['currency_format_red']
+        ratio_format = formats['ratio_format']
+        duration_format = formats['duration_format']
 
 
         # Write bond summary details
@@ -392,6 +2411,8 @@ class ExcelReport:
         worksheet.write("B19", coupn_freq, right_align)
         worksheet.write("A20", "Bond Type", report_descriptions_format)
         worksheet.write("B20", bond_type,right_align)
+        worksheet.write("A21", "Modified Duration", report_descriptions_format)
+        worksheet.write("B21", modified_duration, duration_format)
 
         # Write Amortization Table headers
         worksheet.merge_range('A23:G23', "Bond Amortization Table", amortization_table_topic_format)
@@ -459,12 +2480,268 @@ class ExcelReport:
         worksheet.set_column(8, 16383, None, None, {'hidden': True})
         # worksheet.set_row(chart_row+30, 1048576, None, None, {'hidden': True})
 
-        workbook.close()
+        with INSTRUMENTATION.stage('excel_save'):
+            workbook.close()
+        if cache is not None:
+            cache.put(key, file_name)
         print(f"Excel report generated and saved as {file_name}")
+        return file_name
+
+
+# ========================================================================================================================================================================================================================================================================
+POSITION_FIELDS = ('face_value', 'coupon_rate', 'yield_rate', 'coupon_frequency', 'maturity_date', 'settlement_date')
+VALUATION_FIELDS = ('dirty_price', 'accrued_int', 'clean_price', 'bond_value', 'macaulay_duration', 'modified_duration', 'convexity', 'dv01')
+
+
+def _file_format(path, file_format):
+    """
+    Returns the position file format, taken from the file extension when not given.
+
+    Args:
+        path (str): The file path ('-' for stdin/stdout).
+        file_format (str): 'csv', 'jsonl' or None.
+
+    Returns:
+        str: 'csv' or 'jsonl'.
+    """
+    if file_format:
+        return file_format
+    return 'jsonl' if path.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def read_positions(stream, file_format):
+    """
+    Yields the rows of a CSV or JSON Lines position file one at a time.
+
+    Args:
+        stream (file): The open text stream.
+        file_format (str): 'csv' or 'jsonl'.
+
+    Yields:
+        tuple: (line number, row dictionary or the exception raised reading the line).
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    else:
+        for line_no, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError("expected a JSON object")
+            except ValueError as error:
+                row = error
+            yield line_no, row
+
+
+def parse_positions(rows, settlement_date=None, day_count='ACT/ACT'):
+    """
+    Converts position rows into Bond inputs, passing bad rows through as errors.
+
+    Args:
+        rows (iterable): (line number, row) pairs from read_positions.
+        settlement_date (datetime.date, optional): Settlement date used for rows without one.
+        day_count (str, optional): Day count convention used for rows without a day_count column. Defaults to 'ACT/ACT'.
+
+    Yields:
+        tuple: (line number, row, Bond inputs tuple or None, error message or None).
+    """
+    for line_no, row in rows:
+        if isinstance(row, Exception):
+            yield line_no, {}, None, f"unreadable row: {row}"
+            continue
+        with INSTRUMENTATION.stage('parse'):
+            try:
+                face_value = float(row['face_value'])
+                coupon_rate = float(row['coupon_rate'])
+                yield_rate = float(row['yield_rate'])
+                coupon_frequency = row['coupon_frequency']
+                if isinstance(coupon_frequency, bool) or not float(coupon_frequency).is_integer():
+                    raise ValueError(f"coupon frequency {coupon_frequency!r} is not a whole number")
+                coupon_frequency = int(float(coupon_frequency))
+                maturity_date = datetime.date.fromisoformat(str(row['maturity_date']).strip())
+                settlement = row.get('settlement_date') or settlement_date
+                if settlement is None:
+                    raise KeyError('settlement_date')
+                if not isinstance(settlement, datetime.date):
+                    settlement = datetime.date.fromisoformat(str(settlement).strip())
+                if not all(math.isfinite(value) for value in (face_value, coupon_rate, yield_rate)):
+                    raise ValueError("face value and rates must be finite numbers")
+                if coupon_frequency not in (1, 2, 3, 4, 6, 12):
+                    raise ValueError(f"coupon frequency {coupon_frequency} is not one of 1, 2, 3, 4, 6 or 12")
+                if settlement >= maturity_date:
+                    raise ValueError(f"settlement date {settlement} is not before maturity date {maturity_date}")
+                position_day_count = str(row.get('day_count') or day_count).strip()
+                _day_count(position_day_count)
+            except KeyError as error:
+                inputs, message = None, f"missing field {error}"
+            except (TypeError, ValueError) as error:
+                inputs, message = None, str(error)
+            else:
+                inputs, message = (face_value, coupon_rate, yield_rate, coupon_frequency, maturity_date, settlement, position_day_count), None
+        yield line_no, row, inputs, message
+
+
+def value_positions(positions, chunk_size=1000):
+    """
+    Values parsed positions in fixed-size chunks with BondBatch, keeping the input order.
+
+    Only one chunk is held in memory at a time, so memory stays constant however long the input is.
+
+    Args:
+        positions (iterable): (line number, row, Bond inputs, error) tuples from parse_positions.
+        chunk_size (int, optional): The number of positions priced per batch. Defaults to 1000.
+
+    Yields:
+        tuple: (line number, row, valuation dictionary or None, error message or None).
+    """
+    chunk = []
+    for position in positions:
+        chunk.append(position)
+        if len(chunk) >= chunk_size:
+            yield from _value_chunk(chunk)
+            chunk = []
+    if chunk:
+        yield from _value_chunk(chunk)
+
+
+def value_inputs(inputs):
+    """
+    Values Bond input tuples in one BondBatch pass. When the batch can't be priced, the positions are
+    valued one by one so a single bad position doesn't fail the others.
+
+    Args:
+        inputs (list): Bond inputs tuples, as produced by parse_positions.
+
+    Returns:
+        list: One (valuation dictionary or None, error message or None) pair per input, in order.
+    """
+    if not inputs:
+        return []
+    try:
+        with np.errstate(all='ignore'): # Non-finite valuations are reported as errors below
+            results = {field: values.tolist() for field, values in BondBatch(*zip(*inputs)).price().items()}
+    except (ValueError, OverflowError):
+        if len(inputs) > 1:
+            return [valuation for position in inputs for valuation in value_inputs([position])]
+        return [(None, f"cannot value position: {sys.exc_info()[1]}")]
+
+    valuations = []
+    for position in range(len(inputs)):
+        valuation = {field: results[field][position] for field in VALUATION_FIELDS}
+        if all(math.isfinite(value) for value in valuation.values()):
+            valuations.append((valuation, None))
+        else:
+            valuations.append((None, "valuation is not a finite number"))
+    return valuations
+
+
+def _value_chunk(chunk):
+    """
+    Values one chunk of parsed positions.
+
+    Args:
+        chunk (list): (line number, row, Bond inputs, error) tuples.
+
+    Yields:
+        tuple: (line number, row, valuation dictionary or None, error message or None).
+    """
+    valuations = iter(value_inputs([inputs for _, _, inputs, error in chunk if error is None]))
+    for line_no, row, inputs, error in chunk:
+        if error is not None:
+            yield line_no, row, None, error
+        else:
+            yield (line_no, row) + next(valuations)
+
+
+def write_valuations(valuations, stream, file_format, errors):
+    """
+    Writes valuations row by row and reports bad rows without stopping.
+
+    Args:
+        valuations (iterable): (line number, row, valuation, error) tuples from value_positions.
+        stream (file): The open output text stream.
+        file_format (str): 'csv' or 'jsonl'.
+        errors (file): The stream bad rows are reported to.
+
+    Returns:
+        tuple: The number of valued rows and the number of bad rows.
+    """
+    writer = None
+    valued = failed = 0
+    for line_no, row, valuation, error in valuations:
+        if error is not None:
+            failed += 1
+            errors.write(f"line {line_no}: {error}\n")
+            continue
+        valued += 1
+        record = dict(row)
+        record.update(valuation)
+        with INSTRUMENTATION.stage('write'):
+            if file_format == 'jsonl':
+                stream.write(json.dumps(record, default=str) + "\n")
+                continue
+            if writer is None:
+                fieldnames = list(row) + [field for field in VALUATION_FIELDS if field not in row]
+                writer = csv.DictWriter(stream, fieldnames=fieldnames, extrasaction='ignore', lineterminator="\n")
+                writer.writeheader()
+            writer.writerow(record)
+    return valued, failed
+
+
+def main(argv=None):
+    """
+    Command line entry point for non-interactive batch valuation.
+
+    Example:
+        python Bond_Valuation_Tool.py value positions.csv -o valuations.csv
+
+    Args:
+        argv (list, optional): The command line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: The process exit status.
+    """
+    parser = argparse.ArgumentParser(prog="Bond_Valuation_Tool.py", description="Bond Valuation Tool")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    value_parser = commands.add_parser("value", help="value a CSV or JSON Lines position file")
+    value_parser.add_argument("input", help="position file ('-' for stdin) with columns " + ", ".join(POSITION_FIELDS) + " and an optional day_count")
+    value_parser.add_argument("-o", "--output", default="-", help="valuation file ('-' for stdout, the default)")
+    value_parser.add_argument("--input-format", choices=("csv", "jsonl"), help="defaults to the input file extension")
+    value_parser.add_argument("--output-format", choices=("csv", "jsonl"), help="defaults to the output file extension (the input format for stdout)")
+    value_parser.add_argument("--settlement-date", type=datetime.date.fromisoformat, help="settlement date (YYYY-MM-DD) for rows without one")
+    value_parser.add_argument("--day-count", choices=tuple(DAY_COUNTS), default="ACT/ACT", help="day count convention for rows without one (default ACT/ACT)")
+    value_parser.add_argument("--chunk-size", type=int, default=1000, help="positions priced per batch (default 1000)")
+    value_parser.add_argument("--profile", metavar="DIR", help="time the pipeline stages, print a summary to stderr and dump cProfile/tracemalloc files to DIR")
+
+    args = parser.parse_args(argv)
+    input_format = _file_format(args.input, args.input_format)
+    output_format = args.output_format or (input_format if args.output == "-" else _file_format(args.output, None))
+
+    with contextlib.ExitStack() as stack:
+        if args.profile:
+            stack.enter_context(INSTRUMENTATION.profile(args.profile))
+        source = sys.stdin if args.input == "-" else stack.enter_context(open(args.input, newline=""))
+        target = sys.stdout if args.output == "-" else stack.enter_context(open(args.output, "w", newline=""))
+        rows = read_positions(source, input_format)
+        positions = parse_positions(rows, args.settlement_date, args.day_count)
+        valuations = value_positions(positions, args.chunk_size)
+        valued, failed = write_valuations(valuations, target, output_format, sys.stderr)
+
+    print(f"Valued {valued} positions, {failed} bad rows", file=sys.stderr)
+    if args.profile:
+        print(INSTRUMENTATION.report(), file=sys.stderr)
+    return 0
 
 
 #===================================================================================================================
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main())
 
     print("------------------------------------")
     print("Bond Valuation Report")
@@ -504,10 +2781,13 @@ if __name__ == "__main__":
     print(f"Accrued Interest:    {accrued_int:,.4f}")
     print(f"Clean Price:         {clean_price:,.4f}")
     print(f"Bond Type:           {my_Bond.bond_type}")
+    print(f"Modified Duration:   {modified_duration:,.4f}")
+    print(f"Convexity:           {my_Bond.convexity:,.4f}")
     print("------------------------------------")
     print()
     print("------------------------------------")
     print(f"Bond Value:        {bond_value:,.2f}")
+    print(f"DV01:              {my_Bond.dv01:,.2f}")
     print(f"Settlement Date      {settlement_date}")
     print(f"Last Coupon Date     {last_coupon_date}")
     print(f"Next Coupon Date     {next_coupon_date}")
@@ -0,0 +1,42 @@
+"""
+Throughput of price_parallel and amortization_tables_parallel as the number of worker processes grows.
+
+Usage:
+    python benchmarks/bench_parallel.py --bonds 1000000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import Bond_Valuation_Tool as bvt  # noqa: E402
+from portfolio import synthetic_portfolio  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bonds", type=int, default=500000, help="bonds priced per run (default 500000)")
+    parser.add_argument("--tables", type=int, default=5000, help="amortization tables built per run (default 5000)")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    args = parser.parse_args()
+
+    portfolio = synthetic_portfolio(args.bonds)
+    print(f"{'workers':>8} {'pricing bonds/s':>16} {'speed-up':>9} {'tables/s':>10} {'speed-up':>9}")
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        bvt.price_parallel(*portfolio, workers=workers, chunk_size=args.chunk_size)
+        pricing = args.bonds / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        bvt.amortization_tables_parallel(*[array[:args.tables] for array in portfolio], workers=workers)
+        tables = args.tables / (time.perf_counter() - start)
+
+        baseline = baseline or (pricing, tables)
+        print(f"{workers:>8} {pricing:>16,.0f} {pricing / baseline[0]:>8.2f}x {tables:>10,.0f} {tables / baseline[1]:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
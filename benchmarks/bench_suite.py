@@ -0,0 +1,223 @@
+"""
+Benchmark suite: throughput, latency percentiles and peak memory of the main valuation paths on synthetic portfolios.
+
+Usage:
+    python benchmarks/bench_suite.py --sizes 1 1000 100000 1000000 --output results.json
+    python benchmarks/bench_suite.py --sizes 1000 --profiles short long --output new.json --compare results.json
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import Bond_Valuation_Tool as bvt  # noqa: E402
+from portfolio import MATURITY_PROFILES, bond_inputs, synthetic_portfolio  # noqa: E402
+
+
+def _schedule(portfolio):
+    """ScheduleCache.window for every bond, from a cold cache."""
+    inputs = bond_inputs(portfolio)
+    return [lambda inputs=inputs: [bvt.SCHEDULE_CACHE.window(bond[4], bond[3], bond[5]) for bond in inputs]], len(inputs), False
+
+
+def _bond_price(portfolio):
+    """Bond construction and pricing (bond value and modified duration), one bond per call."""
+    return [lambda bond=bond: (lambda b: (b.bond_value, b.modified_duration))(bvt.Bond(*bond))
+            for bond in bond_inputs(portfolio)], 1, True
+
+
+def _round_number(portfolio):
+    """round_number on every price, one number per call."""
+    return [lambda value=value: bvt.round_number(value, 4) for value in (portfolio[0] * portfolio[2]).tolist()], 1, True
+
+
+def _amortization_table(portfolio):
+    """Bond.get_bond_amortization_table, one bond per call."""
+    return [lambda bond=bond: bvt.Bond(*bond).get_bond_amortization_table() for bond in bond_inputs(portfolio)], 1, True
+
+
+def _excel_report(portfolio):
+    """ExcelReport.generate_excel_report, one workbook per call."""
+    def report(bond):
+        bond = bvt.Bond(*bond)
+        with contextlib.redirect_stdout(io.StringIO()):
+            bvt.ExcelReport().generate_excel_report(
+                bond.face_value, bond.bond_value, bond.dirty_price, bond.clean_price, bond.accrued_int, bond.yield_rate,
+                bond.coupon_rate, bond.compound_frequency, bond.settlement_date, bond.coupon_dates['coupon_dates'][0],
+                bond.coupon_dates['coupon_dates'][1], bond.maturity_date, bond.bond_type, bond.no_of_payment,
+                bond.modified_duration, bond.get_bond_amortization_table())
+    return [lambda bond=bond: report(bond) for bond in bond_inputs(portfolio)], 1, True
+
+
+def _batch_report(portfolio):
+    """ExcelReport.generate_batch_report for the whole portfolio in one workbook."""
+    def report():
+        with contextlib.redirect_stdout(io.StringIO()):
+            bvt.ExcelReport().generate_batch_report((bvt.Bond(*bond) for bond in bond_inputs(portfolio)), "batch_report.xlsx")
+    return [report], portfolio[0].size, False
+
+
+def _price_batch(portfolio):
+    """price_batch for the whole portfolio in one vectorized pass."""
+    return [lambda: bvt.price_batch(*portfolio)], portfolio[0].size, False
+
+
+# name: (setup, largest portfolio run). A setup returns the calls to time, the bonds per call and whether the
+# calls are per bond (latency percentiles are then per bond, otherwise per run)
+BENCHMARKS = {
+    "schedule": (_schedule, 1000000),
+    "bond_price": (_bond_price, 1000000),
+    "round_number": (_round_number, 1000000),
+    "amortization_table": (_amortization_table, 100000),
+    "excel_report": (_excel_report, 100),
+    "batch_report": (_batch_report, 10000),
+    "price_batch": (_price_batch, 1000000),
+}
+
+
+def run_benchmark(name, portfolio, memory=True):
+    """
+    Times one benchmark on a portfolio, then measures its peak traced memory in a second, separate run.
+
+    Args:
+        name (str): The benchmark name, a key of BENCHMARKS.
+        portfolio (tuple): The arrays returned by synthetic_portfolio.
+        memory (bool, optional): Whether to measure peak memory. Defaults to True.
+
+    Returns:
+        dict: The items, seconds, throughput (items per second), latency percentiles (ms) and peak memory (MB).
+    """
+    setup = BENCHMARKS[name][0]
+    bvt.SCHEDULE_CACHE.clear()
+    calls, items_per_call, per_item = setup(portfolio)
+    latencies = np.empty(len(calls))
+    for index, call in enumerate(calls):
+        start = time.perf_counter()
+        call()
+        latencies[index] = time.perf_counter() - start
+    items = len(calls) * items_per_call
+
+    peak_memory = None
+    if memory:
+        bvt.SCHEDULE_CACHE.clear()
+        calls = setup(portfolio)[0]
+        tracemalloc.start()
+        for call in calls:
+            call()
+        peak_memory = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+
+    percentiles = np.percentile(latencies * 1000, [50, 90, 99])
+    return {
+        "items": items,
+        "seconds": float(latencies.sum()),
+        "throughput": items / latencies.sum(),
+        "latency_ms": {"per": "item" if per_item else "run", "p50": float(percentiles[0]), "p90": float(percentiles[1]),
+                       "p99": float(percentiles[2]), "max": float(latencies.max() * 1000)},
+        "peak_memory_mb": peak_memory,
+    }
+
+
+def _metadata():
+    """Python, NumPy, platform and git details recorded with the results."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints the throughput and p99 latency change of every benchmark found in both result sets.
+
+    Args:
+        results (list): The new results.
+        baseline (list): The baseline results.
+        threshold (float): The throughput drop (fraction) reported as a regression.
+
+    Returns:
+        int: The number of regressions.
+    """
+    previous = {(result["benchmark"], result["profile"], result["size"]): result for result in baseline}
+    regressions = 0
+    print(f"\n{'benchmark':<20} {'profile':<8} {'size':>9} {'throughput':>11} {'p99':>8}")
+    for result in results:
+        old = previous.get((result["benchmark"], result["profile"], result["size"]))
+        if old is None:
+            continue
+        throughput = result["throughput"] / old["throughput"]
+        p99 = result["latency_ms"]["p99"] / old["latency_ms"]["p99"] if old["latency_ms"]["p99"] else float("nan")
+        regressed = throughput < 1 - threshold
+        regressions += regressed
+        print(f"{result['benchmark']:<20} {result['profile']:<8} {result['size']:>9,} {throughput:>10.2f}x {p99:>7.2f}x"
+              + ("  REGRESSION" if regressed else ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 1000, 100000], help="portfolio sizes (default 1 1000 100000)")
+    parser.add_argument("--profiles", nargs="+", choices=tuple(MATURITY_PROFILES), default=["mixed"], help="maturity profiles (default mixed)")
+    parser.add_argument("--benchmarks", nargs="+", choices=tuple(BENCHMARKS), default=list(BENCHMARKS), help="benchmarks to run (default all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory runs")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare the results with")
+    parser.add_argument("--threshold", type=float, default=0.1, help="throughput drop reported as a regression (default 0.1)")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = os.path.abspath(args.compare) if args.compare else None
+    results = []
+    print(f"{'benchmark':<20} {'profile':<8} {'size':>9} {'items/s':>12} {'p50 ms':>9} {'p99 ms':>9} {'peak MB':>8}")
+    working_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)  # The Excel benchmarks write their workbooks here
+        try:
+            for profile in args.profiles:
+                for size in args.sizes:
+                    portfolio = synthetic_portfolio(size, args.seed, profile)
+                    for name in args.benchmarks:
+                        limit = BENCHMARKS[name][1]
+                        if size > limit:
+                            continue
+                        result = {"benchmark": name, "profile": profile, "size": size}
+                        result.update(run_benchmark(name, portfolio, not args.no_memory))
+                        results.append(result)
+                        latency = result["latency_ms"]
+                        memory = "" if result["peak_memory_mb"] is None else f"{result['peak_memory_mb']:.1f}"
+                        print(f"{name:<20} {profile:<8} {size:>9,} {result['throughput']:>12,.0f} {latency['p50']:>9.3f} {latency['p99']:>9.3f} {memory:>8}")
+        finally:
+            os.chdir(working_directory)
+
+    if output:
+        with open(output, "w") as stream:
+            json.dump({"metadata": _metadata(), "results": results}, stream, indent=2)
+    if baseline:
+        with open(baseline) as stream:
+            return 1 if compare(results, json.load(stream)["results"], args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
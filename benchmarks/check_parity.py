@@ -0,0 +1,177 @@
+"""
+Checks that the vectorized and incremental pricing paths give the same numbers as one Bond per position:
+BondBatch.price, BondBatch.price_scenarios, BondRepricer, Bond.value_over_dates and YieldCurve.price_batch.
+Exits with status 1 on any mismatch.
+
+Usage:
+    python benchmarks/check_parity.py --bonds 3000
+"""
+import argparse
+import datetime
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import Bond_Valuation_Tool as bvt  # noqa: E402
+
+# Prices, accrued interest and day counts must match exactly. The risk measures are unrounded closed forms that
+# lose a few digits to cancellation at small period yields, where Bond (math) and BondBatch (NumPy) round differently
+RISK_FIELDS = ('macaulay_duration', 'modified_duration', 'convexity', 'dv01')
+RISK_TOLERANCE = 1e-7  # Relative
+
+
+def random_bonds(size, seed=0):
+    """
+    Builds random Bond inputs covering every coupon frequency and day count, with random settlement
+    dates and one maturity in four on a month end (which exercises the day-of-month clamping).
+
+    Args:
+        size (int): The number of bonds.
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        list: One (face value, coupon rate, yield rate, coupon frequency, maturity date, settlement date, day count) tuple per bond.
+    """
+    rng = np.random.default_rng(seed)
+    day_counts = tuple(bvt.DAY_COUNTS)
+    bonds = []
+    for _ in range(size):
+        settlement_date = datetime.date(2020, 1, 1) + datetime.timedelta(days=int(rng.integers(0, 365 * 6)))
+        maturity_date = settlement_date + datetime.timedelta(days=int(rng.integers(2, 365 * 30)))
+        if rng.random() < 0.25:
+            next_month = datetime.date(maturity_date.year + maturity_date.month // 12, maturity_date.month % 12 + 1, 1)
+            maturity_date = max(next_month - datetime.timedelta(days=1), settlement_date + datetime.timedelta(days=1))
+        bonds.append((
+            float(rng.choice([1000.0, 10000.0, 1000000.0])),
+            round(float(rng.uniform(0.0, 0.1)), 4),
+            round(float(rng.uniform(0.001, 0.1)), 4),
+            int(rng.choice([1, 2, 3, 4, 6, 12])),
+            maturity_date,
+            settlement_date,
+            day_counts[int(rng.integers(len(day_counts)))],
+        ))
+    return bonds
+
+
+def _close(actual, expected, field=None):
+    """Whether two values of a field agree: exactly, or within RISK_TOLERANCE (relative) for a risk measure."""
+    if field in RISK_FIELDS:
+        return abs(actual - expected) <= RISK_TOLERANCE * max(1.0, abs(expected))
+    return actual == expected
+
+
+def check_batch(bonds):
+    """BondBatch.price against Bond: coupon window, payment count, DSC, E and every valuation field."""
+    batch = bvt.BondBatch(*zip(*bonds))
+    results = batch.price()
+    failures = []
+    for position, inputs in enumerate(bonds):
+        bond = bvt.Bond(*inputs)
+        ordinals, index = bond.coupon_schedule
+        schedule = (
+            batch.previous_coupon_date[position] == np.datetime64(datetime.date.fromordinal(ordinals[index]))
+            and batch.next_coupon_date[position] == np.datetime64(datetime.date.fromordinal(ordinals[index + 1]))
+            and batch.no_of_payment[position] == bond.no_of_payment
+            and batch.DSC[position] == bond.DSC
+            and batch.E[position] == bond.E
+        )
+        fields = [field for field in bvt.VALUATION_FIELDS if not _close(results[field][position], getattr(bond, field), field)]
+        if not schedule or fields:
+            failures.append(f"{inputs}: {'schedule ' if not schedule else ''}{' '.join(fields)}")
+    return failures
+
+
+def check_scenarios(bonds, shocks=(-0.01, -0.0001, 0.0, 0.0001, 0.01)):
+    """BondBatch.price_scenarios against Bond with the shocked yield."""
+    scenarios = bvt.BondBatch(*zip(*bonds)).price_scenarios(shocks)
+    failures = []
+    for position, inputs in enumerate(bonds):
+        for column, shock in enumerate(shocks):
+            if inputs[2] + shock <= 0:
+                continue
+            bond = bvt.Bond(inputs[0], inputs[1], inputs[2] + shock, *inputs[3:])
+            fields = [field for field in ('dirty_price', 'clean_price', 'bond_value')
+                      if not _close(scenarios[field][position, column], getattr(bond, field))]
+            if fields:
+                failures.append(f"{inputs} shock {shock}: {' '.join(fields)}")
+    return failures
+
+
+def check_repricer(bonds, yield_rates=(0.001, 0.035, 0.08)):
+    """BondRepricer.reprice and reprice_many against a new Bond at each yield."""
+    failures = []
+    for inputs in bonds:
+        repricer = bvt.Bond(*inputs).repricer()
+        many = repricer.reprice_many(yield_rates)
+        for column, yield_rate in enumerate(yield_rates):
+            bond = bvt.Bond(inputs[0], inputs[1], yield_rate, *inputs[3:])
+            one = repricer.reprice(yield_rate)
+            fields = [field for field in ('dirty_price', 'clean_price', 'bond_value')
+                      if not (_close(one[field], getattr(bond, field)) and _close(many[field][column], getattr(bond, field)))]
+            if fields:
+                failures.append(f"{inputs} yield {yield_rate}: {' '.join(fields)}")
+    return failures
+
+
+def check_value_over_dates(bonds, dates=40):
+    """Bond.value_over_dates against a Bond built on each settlement date."""
+    failures = []
+    for inputs in bonds:
+        series = bvt.Bond(*inputs).value_over_dates(step=max(1, (inputs[4] - inputs[5]).days // dates))
+        for position, settlement_date in enumerate(series['settlement_date'].astype(object)):
+            bond = bvt.Bond(*inputs[:5], settlement_date, inputs[6])
+            fields = [field for field in ('no_of_payment', 'DSC', 'E', 'dirty_price', 'accrued_int', 'clean_price', 'bond_value')
+                      if not _close(series[field][position], getattr(bond, field))]
+            if fields:
+                failures.append(f"{inputs} on {settlement_date}: {' '.join(fields)}")
+    return failures
+
+
+def check_curve(bonds):
+    """YieldCurve.price_batch against YieldCurve.price on each Bond."""
+    curve_date = min(inputs[5] for inputs in bonds)
+    node_dates = [curve_date + datetime.timedelta(days=days) for days in (90, 365, 365 * 5, 365 * 10, 365 * 30)]
+    curve = bvt.YieldCurve(curve_date, node_dates, [0.99, 0.96, 0.82, 0.66, 0.3])
+    results = curve.price_batch(bvt.BondBatch(*zip(*bonds)))
+    failures = []
+    for position, inputs in enumerate(bonds):
+        single = curve.price(bvt.Bond(*inputs))
+        fields = [field for field in single if not _close(results[field][position], single[field])]
+        if fields:
+            failures.append(f"{inputs}: {' '.join(fields)}")
+    return failures
+
+
+CHECKS = {
+    "batch": check_batch,
+    "scenarios": check_scenarios,
+    "repricer": check_repricer,
+    "value_over_dates": check_value_over_dates,
+    "curve": check_curve,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bonds", type=int, default=3000, help="random bonds per check (default 3000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--checks", nargs="+", choices=tuple(CHECKS), default=list(CHECKS), help="checks to run (default all)")
+    args = parser.parse_args()
+
+    bonds = random_bonds(args.bonds, args.seed)
+    total = 0
+    for name in args.checks:
+        # The per-date and per-yield checks build many Bonds per position, so they use a slice of the portfolio
+        sample = bonds if name in ("batch", "curve") else bonds[:max(1, len(bonds) // 10)]
+        failures = CHECKS[name](sample)
+        total += len(failures)
+        print(f"{name:<18} {len(sample):>6,} bonds  {'ok' if not failures else f'{len(failures)} mismatches'}")
+        for failure in failures[:5]:
+            print(f"    {failure}")
+    return 1 if total else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Synthetic bond portfolios shared by the benchmarks.
+"""
+import numpy as np
+
+# Maturity ranges in days from settlement for each portfolio profile
+MATURITY_PROFILES = {
+    "short": (30, 365 * 3),
+    "long": (365 * 20, 365 * 30),
+    "mixed": (365, 365 * 30),
+}
+
+
+def synthetic_portfolio(size, seed=0, profile="mixed", frequencies=(1, 2, 4, 12)):
+    """
+    Builds random Bond inputs with monthly to annual coupons and one settlement date.
+
+    Args:
+        size (int): The number of bonds.
+        seed (int, optional): The random seed. Defaults to 0.
+        profile (str, optional): 'short' (up to 3 years), 'long' (20 to 30 years) or 'mixed' (1 to 30 years). Defaults to 'mixed'.
+        frequencies (tuple, optional): The coupon frequencies drawn from. Defaults to (1, 2, 4, 12).
+
+    Returns:
+        tuple: The face value, coupon rate, yield rate, coupon frequency, maturity date and settlement date arrays.
+    """
+    rng = np.random.default_rng(seed)
+    settlement_date = np.datetime64("2024-12-31")
+    maturity_date = settlement_date + rng.integers(*MATURITY_PROFILES[profile], size)
+    return (
+        rng.choice([1000.0, 10000.0, 1000000.0], size),
+        rng.uniform(0.0, 0.1, size).round(4),
+        rng.uniform(0.001, 0.1, size).round(4),
+        rng.choice(frequencies, size),
+        maturity_date,
+        np.full(size, settlement_date),
+    )
+
+
+def bond_inputs(portfolio):
+    """
+    Converts a portfolio of arrays into per-bond Python inputs for Bond.
+
+    Args:
+        portfolio (tuple): The arrays returned by synthetic_portfolio.
+
+    Returns:
+        list: One (face value, coupon rate, yield rate, coupon frequency, maturity date, settlement date) tuple per bond.
+    """
+    face_value, coupon_rate, yield_rate, coupon_frequency, maturity_date, settlement_date = portfolio
+    return list(zip(face_value.tolist(), coupon_rate.tolist(), yield_rate.tolist(), coupon_frequency.tolist(),
+                    maturity_date.astype(object), settlement_date.astype(object)))